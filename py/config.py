@@ -1,5 +1,7 @@
-import argparse
+import contextlib
 import copy
+import functools
+import hashlib
 import ipaddress
 import json
 import logging
@@ -8,13 +10,9 @@ import os
 import sys
 import threading
 import time
-import uuid
 from shutil import copyfile
 from typing import Any, Dict, List, Optional, Tuple
 
-import shure
-import offline
-
 from logging_utils import (
     LOG_FILENAME,
     build_logging_config,
@@ -51,7 +49,7 @@ gif_dir = ''
 
 group_update_list = []
 
-args = {}
+args: Dict[str, Any] = {}
 
 DEFAULT_DISCOVERY_SETTINGS = {
     'auto': True,
@@ -94,6 +92,46 @@ DEFAULT_BACKGROUND_SETTINGS = {
 }
 
 
+def _json_clone(value: Any) -> Any:
+    """Copy a JSON-shaped value -- what config.json can hold -- for a caller.
+
+    copy.deepcopy handles arbitrary object graphs and pays for it with a memo
+    and a dispatch per object; the tree only ever holds dicts, lists and
+    scalars, and the getters below copy part of it on every request. Anything
+    else still goes through deepcopy rather than being shared by mistake.
+    """
+    kind = type(value)
+    if kind is dict:
+        return {key: _json_clone(item) for key, item in value.items()}
+    if kind is list:
+        return [_json_clone(item) for item in value]
+    if value is None or kind in (str, int, float, bool):
+        return value
+    return copy.deepcopy(value)
+
+
+# Sections that have been through their ensure_*_defaults pass, keyed by name,
+# holding the very object that was normalised. The getters and the web
+# handlers call the ensure functions on every request; when the tree still
+# holds that same object, nothing can have made it invalid since, and the walk
+# is skipped. Kept here rather than as a marker inside the tree so it can never
+# reach config.json; replacing a section or the whole tree -- rebuild_from_disk,
+# a test's monkeypatch -- is a new object and simply misses.
+_normalized_sections: Dict[str, Any] = {}
+
+
+def _normalized_section(name: str) -> Optional[Dict[str, Any]]:
+    section = config_tree.get(name)
+    if section is not None and _normalized_sections.get(name) is section:
+        return section
+    return None
+
+
+def _forget_normalized(name: str) -> None:
+    """Call after changing a section in place, so the next ensure re-checks it."""
+    _normalized_sections.pop(name, None)
+
+
 def ensure_background_defaults() -> Dict[str, Any]:
     defaults = config_tree.get('background_defaults')
     if not isinstance(defaults, dict):
@@ -110,7 +148,7 @@ def ensure_background_defaults() -> Dict[str, Any]:
 
 
 def get_background_defaults() -> Dict[str, Any]:
-    return copy.deepcopy(ensure_background_defaults())
+    return _json_clone(ensure_background_defaults())
 
 
 def get_background_default_mode() -> str:
@@ -129,6 +167,78 @@ def _normalize_background_mode(value: Optional[str]) -> Optional[str]:
     return mode
 
 
+def _fast_ipv4_network(candidate: str) -> Optional[str]:
+    """Normalise a plain dotted-quad address or /16-/32 CIDR without ipaddress.
+
+    ipaddress builds several objects per entry and tries every form it
+    accepts on the way. This takes only the unambiguous spelling -- four
+    decimal octets with no leading zeros, an optional numeric prefix of 16 or
+    more -- and returns None for everything else, so the caller hands it to
+    ipaddress and every error and warning stays exactly as it was.
+    """
+    host, sep, prefix_text = candidate.partition('/')
+    if sep:
+        if not (prefix_text.isascii() and prefix_text.isdigit()) or len(prefix_text) > 2:
+            return None
+        prefix = int(prefix_text)
+        if prefix < 16 or prefix > 32:
+            return None
+    else:
+        prefix = 32
+
+    octets = host.split('.')
+    if len(octets) != 4:
+        return None
+    value = 0
+    for octet in octets:
+        if not (octet.isascii() and octet.isdigit()) or len(octet) > 3:
+            return None
+        if len(octet) > 1 and octet[0] == '0':
+            return None
+        number = int(octet)
+        if number > 255:
+            return None
+        value = (value << 8) | number
+
+    value &= (0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF
+    return '{}.{}.{}.{}/{}'.format(
+        value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF, prefix)
+
+
+@functools.lru_cache(maxsize=1024)
+def _normalize_one_subnet(candidate: str) -> str:
+    """The network *candidate* names, as 'a.b.c.d/nn'.
+
+    The settings panel posts the whole subnet list on every change, so the
+    same handful of strings comes through again and again. Only accepted
+    entries are cached -- lru_cache does not keep exceptions -- so a rejected
+    one is warned about every time it is submitted, as before.
+    """
+    key = _fast_ipv4_network(candidate)
+    if key is not None:
+        return key
+
+    try:
+        if '/' in candidate:
+            network = ipaddress.ip_network(candidate, strict=False)
+        else:
+            ip_obj = ipaddress.ip_address(candidate)
+            network = ipaddress.ip_network(f'{ip_obj}/32', strict=False)
+    except ValueError:
+        logger.warning("Invalid discovery subnet '%s' ignored", candidate)
+        raise
+
+    if network.version != 4:
+        logger.warning('Ignoring non-IPv4 discovery subnet %s', candidate)
+        raise ValueError(candidate)
+
+    if network.prefixlen < 16:
+        logger.warning('Discovery subnet %s is too broad; minimum /16', network)
+        raise ValueError(candidate)
+
+    return str(network)
+
+
 def _normalized_subnet_list(candidates) -> List[str]:
     normalized: List[str] = []
     seen = set()
@@ -143,24 +253,10 @@ def _normalized_subnet_list(candidates) -> List[str]:
             continue
 
         try:
-            if '/' in candidate:
-                network = ipaddress.ip_network(candidate, strict=False)
-            else:
-                ip_obj = ipaddress.ip_address(candidate)
-                network = ipaddress.ip_network(f'{ip_obj}/32', strict=False)
+            key = _normalize_one_subnet(candidate)
         except ValueError:
-            logger.warning("Invalid discovery subnet '%s' ignored", candidate)
-            continue
-
-        if network.version != 4:
-            logger.warning('Ignoring non-IPv4 discovery subnet %s', candidate)
-            continue
-
-        if network.prefixlen < 16:
-            logger.warning('Discovery subnet %s is too broad; minimum /16', network)
             continue
 
-        key = str(network)
         if key in seen:
             continue
         seen.add(key)
@@ -169,8 +265,26 @@ def _normalized_subnet_list(candidates) -> List[str]:
     return normalized
 
 
+def _clamp_int(value: Any, low: int, high: Optional[int] = None) -> Optional[int]:
+    """``int(value)`` held within [low, high], or None when it is not a number.
+
+    Values that have been through normalisation once are already ints, so
+    those skip the conversion.
+    """
+    if type(value) is not int:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return None
+    if value < low:
+        return low
+    if high is not None and value > high:
+        return high
+    return value
+
+
 def normalize_discovery_settings(payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
-    normalized = copy.deepcopy(DEFAULT_DISCOVERY_SETTINGS)
+    normalized = _json_clone(DEFAULT_DISCOVERY_SETTINGS)
     if not isinstance(payload, dict):
         return normalized
 
@@ -188,45 +302,41 @@ def normalize_discovery_settings(payload: Optional[Dict[str, Any]]) -> Dict[str,
 
     interval = payload.get('scan_interval')
     if interval is not None:
-        try:
-            value = int(interval)
-            if value < DISCOVERY_MIN_INTERVAL:
-                value = DISCOVERY_MIN_INTERVAL
-            elif value > DISCOVERY_MAX_INTERVAL:
-                value = DISCOVERY_MAX_INTERVAL
-            normalized['scan_interval'] = value
-        except (TypeError, ValueError):
+        value = _clamp_int(interval, DISCOVERY_MIN_INTERVAL, DISCOVERY_MAX_INTERVAL)
+        if value is None:
             logger.warning("Invalid discovery scan interval '%s'", interval)
+        else:
+            normalized['scan_interval'] = value
 
     timeout_field = payload.get('timeout_ms')
     if timeout_field is not None:
-        try:
-            timeout_value = int(timeout_field)
-            if timeout_value < DISCOVERY_MIN_TIMEOUT:
-                timeout_value = DISCOVERY_MIN_TIMEOUT
-            elif timeout_value > DISCOVERY_MAX_TIMEOUT:
-                timeout_value = DISCOVERY_MAX_TIMEOUT
-            normalized['timeout_ms'] = timeout_value
-        except (TypeError, ValueError):
+        timeout_value = _clamp_int(timeout_field, DISCOVERY_MIN_TIMEOUT, DISCOVERY_MAX_TIMEOUT)
+        if timeout_value is None:
             logger.warning("Invalid discovery timeout '%s'", timeout_field)
+        else:
+            normalized['timeout_ms'] = timeout_value
 
     return normalized
 
 
 def ensure_discovery_defaults() -> Dict[str, Any]:
-    discovery_cfg = config_tree.get('discovery')
-    normalized = normalize_discovery_settings(discovery_cfg)
-    config_tree['discovery'] = normalized
-    return copy.deepcopy(normalized)
+    """Normalise the discovery section in place and return it -- not a copy."""
+    normalized = _normalized_section('discovery')
+    if normalized is None:
+        normalized = normalize_discovery_settings(config_tree.get('discovery'))
+        config_tree['discovery'] = normalized
+        _normalized_sections['discovery'] = normalized
+    return normalized
 
 
 def get_discovery_settings() -> Dict[str, Any]:
-    return copy.deepcopy(ensure_discovery_defaults())
+    return _json_clone(ensure_discovery_defaults())
 
 
 def update_discovery_settings(payload: Optional[Dict[str, Any]], *, persist: bool = True) -> Dict[str, Any]:
     normalized = normalize_discovery_settings(payload)
     config_tree['discovery'] = normalized
+    _normalized_sections['discovery'] = normalized
     if persist:
         save_current_config()
     logger.info(
@@ -238,10 +348,11 @@ def update_discovery_settings(payload: Optional[Dict[str, Any]], *, persist: boo
             'timeout_ms': normalized['timeout_ms'],
         }}
     )
-    return copy.deepcopy(normalized)
+    return _json_clone(normalized)
 
 def uuid_init():
     if 'uuid' not in config_tree:
+        import uuid
         micboard_uuid = str(uuid.uuid4())
         config_tree['uuid'] = micboard_uuid
         # Held in memory only when the file did not load cleanly. A config
@@ -263,7 +374,7 @@ def logging_init():
 
 
 def web_port():
-    server_port = args.get('server_port') if isinstance(args, dict) else None
+    server_port = args.get('server_port')
     if server_port is not None:
         return int(server_port)
 
@@ -292,56 +403,100 @@ def os_config_path():
     return path
 
 
-def config_path(folder=None):
-    config_path_arg = args.get('config_path') if isinstance(args, dict) else None
+# The configuration directory, resolved once per config() rather than on every
+# call. Resolving it stats up to three directories, and config_path() sits
+# under every save, every log path and every background lookup.
+_config_dir = None
+
+
+def _reset_path_caches():
+    """Forget resolved paths; config() calls this whenever args are re-read."""
+    global _config_dir, _config_file_cache, _cli_gif_dir
+    _config_dir = None
+    _config_file_cache = None
+    _cli_gif_dir = None
+    _ensured_dirs.clear()
+
+
+def _resolve_config_dir():
+    config_path_arg = args.get('config_path')
     if config_path_arg is not None:
         expanded = os.path.expanduser(config_path_arg)
         if os.path.exists(expanded):
-            path = expanded
-        else:
-            logger.warning("Invalid config path")
-            sys.exit()
+            return expanded
+        logger.warning("Invalid config path")
+        sys.exit()
 
-    else:
-        base_path = os_config_path()
-        preferred_path = os.path.join(base_path, APPNAME)
-        legacy_path = os.path.join(base_path, LEGACY_APPNAME)
-
-        if os.path.exists(preferred_path):
-            path = preferred_path
-        elif os.path.exists(legacy_path):
-            logger.info('Reusing legacy configuration directory at %s', legacy_path)
-            path = legacy_path
-        else:
-            os.makedirs(preferred_path)
-            path = preferred_path
+    base_path = os_config_path()
+    preferred_path = os.path.join(base_path, APPNAME)
+    legacy_path = os.path.join(base_path, LEGACY_APPNAME)
+
+    if os.path.exists(preferred_path):
+        return preferred_path
+    if os.path.exists(legacy_path):
+        logger.info('Reusing legacy configuration directory at %s', legacy_path)
+        return legacy_path
+    os.makedirs(preferred_path)
+    return preferred_path
+
+
+def config_path(folder=None):
+    global _config_dir
+    path = _config_dir
+    if path is None:
+        path = _config_dir = _resolve_config_dir()
 
     if folder:
         return os.path.join(path, folder)
     return path
 
-def logs_dir():
-    path = config_path('logs')
-    os.makedirs(path, exist_ok=True)
+# Directories this process has already created or found. makedirs with
+# exist_ok still costs a mkdir and a stat per call, and logs_dir() sits under
+# every log viewer request. Cleared with the path caches.
+_ensured_dirs = set()
+
+
+def _ensure_dir(path):
+    if path not in _ensured_dirs:
+        os.makedirs(path, exist_ok=True)
+        _ensured_dirs.add(path)
     return path
 
 
+def logs_dir():
+    return _ensure_dir(config_path('logs'))
+
+
 def log_file():
     return os.path.join(logs_dir(), LOG_FILENAME)
 
 
+# The (settings, log file) logging was last configured with. config() applies
+# the defaults and then the saved settings, which are usually the same, and
+# saving the logging page unchanged applies them again; each dictConfig
+# closes and reopens every handler, the log file included.
+_applied_logging = None
+
+
 def configure_logging(settings=None):
+    global _applied_logging
     normalized = normalize_settings(settings or {})
     logfile = log_file()
-    os.makedirs(os.path.dirname(logfile), exist_ok=True)
+    applied = (dict(normalized, levels=dict(normalized['levels'])), logfile)
+    if applied == _applied_logging:
+        return normalized
     config_dict = build_logging_config(normalized, logfile)
     logging.config.dictConfig(config_dict)
+    _applied_logging = applied
     return normalized
 
 
 def ensure_logging_defaults():
-    normalized = normalize_settings(config_tree.get('logging') or {})
-    config_tree['logging'] = normalized
+    normalized = _normalized_section('logging')
+    if normalized is None:
+        normalized = normalize_settings(config_tree.get('logging') or {})
+        config_tree['logging'] = normalized
+        _normalized_sections['logging'] = normalized
     return normalized
 
 
@@ -410,10 +565,20 @@ def migrate_pco_number_fallback() -> bool:
 
 
 def ensure_cloud_defaults() -> Dict[str, Any]:
+    """Normalise the cloud section in place and return it -- not a copy.
+
+    Internal callers only need the tree to be valid; the public getters take
+    the one copy a caller is handed.
+    """
+    cloud_cfg = _normalized_section('cloud')
+    if cloud_cfg is not None:
+        return cloud_cfg
+
     cloud_cfg = config_tree.get('cloud')
     if not isinstance(cloud_cfg, dict):
-        config_tree['cloud'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS)
-        return copy.deepcopy(config_tree['cloud'])
+        config_tree['cloud'] = _json_clone(DEFAULT_CLOUD_SETTINGS)
+        _normalized_sections['cloud'] = config_tree['cloud']
+        return config_tree['cloud']
 
     providers = cloud_cfg.setdefault('providers', {})
     if not isinstance(providers, dict):
@@ -422,7 +587,7 @@ def ensure_cloud_defaults() -> Dict[str, Any]:
 
     provider = providers.get('google_drive')
     if not isinstance(provider, dict):
-        providers['google_drive'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive'])
+        providers['google_drive'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive'])
         provider = providers['google_drive']
 
     provider.setdefault('enabled', False)
@@ -433,38 +598,34 @@ def ensure_cloud_defaults() -> Dict[str, Any]:
 
     auth_cfg = provider.get('auth')
     if not isinstance(auth_cfg, dict):
-        provider['auth'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth'])
+        provider['auth'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth'])
     else:
         auth_cfg.setdefault('credential_id', DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth']['credential_id'])
         auth_cfg.setdefault('has_credentials', False)
         scopes = auth_cfg.get('scopes')
         if not isinstance(scopes, list):
-            auth_cfg['scopes'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth']['scopes'])
+            auth_cfg['scopes'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth']['scopes'])
         auth_cfg.setdefault('updated_at', None)
 
     cache_cfg = provider.get('cache')
     if not isinstance(cache_cfg, dict):
-        provider['cache'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['cache'])
+        provider['cache'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['cache'])
     else:
         cache_cfg.setdefault('default', False)
         cache_cfg.setdefault('directory', None)
-        try:
-            cache_cfg['max_age_hours'] = int(cache_cfg.get('max_age_hours', 168) or 168)
-        except (TypeError, ValueError):
-            cache_cfg['max_age_hours'] = 168
-        if cache_cfg['max_age_hours'] < 1:
-            cache_cfg['max_age_hours'] = 1
+        max_age = _clamp_int(cache_cfg.get('max_age_hours', 168) or 168, 1)
+        cache_cfg['max_age_hours'] = 168 if max_age is None else max_age
 
     slot_sources = cloud_cfg.get('slot_sources')
     if not isinstance(slot_sources, dict):
         cloud_cfg['slot_sources'] = {}
 
-    return copy.deepcopy(cloud_cfg)
+    _normalized_sections['cloud'] = cloud_cfg
+    return cloud_cfg
 
 
 def get_logging_settings() -> Dict[str, Any]:
-    ensure_logging_defaults()
-    return copy.deepcopy(config_tree.get('logging', {}))
+    return _json_clone(ensure_logging_defaults())
 
 
 def update_logging_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -472,7 +633,9 @@ def update_logging_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError('Invalid logging configuration payload')
 
     current = ensure_logging_defaults()
-    merged = copy.deepcopy(current)
+    # Shallow: keys are only replaced here, and normalize_settings builds a
+    # fresh dict, levels included, from whatever it is given.
+    merged = dict(current)
 
     for key in ('level', 'console_level', 'max_bytes', 'backups'):
         if key in payload:
@@ -489,21 +652,19 @@ def update_logging_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     normalized = normalize_settings(merged)
     config_tree['logging'] = normalized
+    _normalized_sections['logging'] = normalized
     configure_logging(normalized)
     save_current_config()
     logger.info('Logging configuration updated', extra={'context': {'level': normalized['level'], 'console_level': normalized['console_level']}})
-    return copy.deepcopy(normalized)
+    return _json_clone(normalized)
 
 
 def get_cloud_settings() -> Dict[str, Any]:
-    ensure_cloud_defaults()
-    return copy.deepcopy(config_tree.get('cloud', {}))
+    return _json_clone(ensure_cloud_defaults())
 
 
 def get_google_drive_settings() -> Dict[str, Any]:
-    ensure_cloud_defaults()
-    provider = config_tree['cloud']['providers']['google_drive']
-    return copy.deepcopy(provider)
+    return _json_clone(ensure_cloud_defaults()['providers']['google_drive'])
 
 
 def update_google_drive_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -512,6 +673,7 @@ def update_google_drive_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError('Invalid Google Drive configuration payload')
 
     provider = config_tree['cloud']['providers']['google_drive']
+    _forget_normalized('cloud')
 
     if 'enabled' in payload:
         provider['enabled'] = bool(payload['enabled'])
@@ -521,14 +683,14 @@ def update_google_drive_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
         if client_payload is None:
             provider['client'] = {}
         elif isinstance(client_payload, dict):
-            provider['client'] = copy.deepcopy(client_payload)
+            provider['client'] = _json_clone(client_payload)
         else:
             raise ValueError('google_drive.client must be an object')
 
     if 'cache' in payload:
         cache_payload = payload['cache']
         if cache_payload is None:
-            provider['cache'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['cache'])
+            provider['cache'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['cache'])
         elif isinstance(cache_payload, dict):
             cache_cfg = provider.setdefault('cache', {})
             if not isinstance(cache_cfg, dict):
@@ -560,7 +722,7 @@ def update_google_drive_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
     if 'auth' in payload:
         auth_payload = payload['auth']
         if auth_payload is None:
-            provider['auth'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth'])
+            provider['auth'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth'])
         elif isinstance(auth_payload, dict):
             auth_cfg = provider.setdefault('auth', {})
             if not isinstance(auth_cfg, dict):
@@ -574,7 +736,7 @@ def update_google_drive_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
             if isinstance(scopes_payload, (list, tuple)):
                 auth_cfg['scopes'] = [str(scope) for scope in scopes_payload if scope]
             elif scopes_payload is None:
-                auth_cfg['scopes'] = copy.deepcopy(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth']['scopes'])
+                auth_cfg['scopes'] = _json_clone(DEFAULT_CLOUD_SETTINGS['providers']['google_drive']['auth']['scopes'])
             if 'updated_at' in auth_payload:
                 updated_value = auth_payload['updated_at']
                 auth_cfg['updated_at'] = str(updated_value) if updated_value else None
@@ -583,7 +745,7 @@ def update_google_drive_settings(payload: Dict[str, Any]) -> Dict[str, Any]:
             raise ValueError('google_drive.auth must be an object or null')
 
     save_current_config()
-    return copy.deepcopy(provider)
+    return _json_clone(provider)
 
 
 def update_google_drive_auth_metadata(metadata: Dict[str, Any], *, persist: bool = True) -> Dict[str, Any]:
@@ -592,25 +754,25 @@ def update_google_drive_auth_metadata(metadata: Dict[str, Any], *, persist: bool
         raise ValueError('Invalid Google Drive auth metadata payload')
 
     provider = config_tree['cloud']['providers']['google_drive']
-    provider['auth'] = copy.deepcopy(metadata)
+    provider['auth'] = _json_clone(metadata)
+    _forget_normalized('cloud')
     if persist:
         save_current_config()
-    return copy.deepcopy(provider['auth'])
+    return _json_clone(provider['auth'])
 
 
 def get_slot_media_sources() -> Dict[str, Any]:
-    ensure_cloud_defaults()
-    return copy.deepcopy(config_tree['cloud'].get('slot_sources', {}))
+    return _json_clone(ensure_cloud_defaults().get('slot_sources', {}))
 
 
 def update_slot_media_sources(payload: Dict[str, Any], *, persist: bool = True) -> Dict[str, Any]:
     ensure_cloud_defaults()
     if not isinstance(payload, dict):
         raise ValueError('slot source payload must be an object')
-    config_tree['cloud']['slot_sources'] = copy.deepcopy(payload)
+    config_tree['cloud']['slot_sources'] = _json_clone(payload)
     if persist:
         save_current_config()
-    return copy.deepcopy(config_tree['cloud']['slot_sources'])
+    return _json_clone(config_tree['cloud']['slot_sources'])
 
 # https://stackoverflow.com/questions/404744/determining-application-path-in-a-python-exe-generated-by-pyinstaller
 def app_dir(folder=None):
@@ -636,17 +798,26 @@ def app_dir(folder=None):
 
 
 def default_gif_dir():
-    path = config_path('backgrounds')
-    if not os.path.exists(path):
-        os.makedirs(path)
-    print("GIFCHECK!")
+    path = _ensure_dir(config_path('backgrounds'))
+    logger.debug('Using the default background directory %s', path)
     return path
 
+# The command-line background directory as (argument, expanded path), checked
+# once per config(). Background assets and the file list resolve the directory
+# on every request, and an override does not change while the process runs.
+_cli_gif_dir = None
+
+
 def get_gif_dir():
-    background_directory = args.get('background_directory') if isinstance(args, dict) else None
+    global _cli_gif_dir
+    background_directory = args.get('background_directory')
     if background_directory not in (None, ''):
+        cached = _cli_gif_dir
+        if cached is not None and cached[0] == background_directory:
+            return cached[1]
         expanded = os.path.expanduser(background_directory)
         if os.path.exists(expanded):
+            _cli_gif_dir = (background_directory, expanded)
             return expanded
         else:
             logger.warning("invalid config path")
@@ -662,9 +833,27 @@ def default_background_path() -> str:
     return os.path.abspath(os.path.join(config_path(), 'backgrounds'))
 
 
+# path -> (is a directory, monotonic deadline). The settings panel asks for the
+# background state repeatedly while it is open; whether a folder exists is
+# worth a stat every few seconds, not one per request. set_background_directory
+# clears it, so the state it returns reflects the folder it just created.
+_isdir_cache: Dict[str, Tuple[bool, float]] = {}
+_ISDIR_TTL_SECONDS = 5
+
+
+def _isdir_recently(path: str) -> bool:
+    now = time.monotonic()
+    cached = _isdir_cache.get(path)
+    if cached is not None and now < cached[1]:
+        return cached[0]
+    exists = os.path.isdir(path)
+    _isdir_cache[path] = (exists, now + _ISDIR_TTL_SECONDS)
+    return exists
+
+
 def get_background_directory_state() -> Dict[str, Any]:
     default_path = default_background_path()
-    background_directory = args.get('background_directory') if isinstance(args, dict) else None
+    background_directory = args.get('background_directory')
     if background_directory in (None, ''):
         background_directory = None
 
@@ -680,7 +869,7 @@ def get_background_directory_state() -> Dict[str, Any]:
             'configured_path': resolved,
             'default_path': default_path,
             'cli_override': True,
-            'exists': os.path.isdir(resolved),
+            'exists': _isdir_recently(resolved),
             'default_mode': default_mode,
             'supported_modes': supported_modes,
         }
@@ -694,7 +883,7 @@ def get_background_directory_state() -> Dict[str, Any]:
             'configured_path': background_folder,
             'default_path': default_path,
             'cli_override': False,
-            'exists': os.path.isdir(resolved),
+            'exists': _isdir_recently(resolved),
             'default_mode': default_mode,
             'supported_modes': supported_modes,
         }
@@ -706,15 +895,16 @@ def get_background_directory_state() -> Dict[str, Any]:
         'configured_path': None,
         'default_path': default_path,
         'cli_override': False,
-        'exists': os.path.isdir(resolved_default),
+        'exists': _isdir_recently(resolved_default),
         'default_mode': default_mode,
         'supported_modes': supported_modes,
     }
 
 
 def set_background_directory(path: Optional[str], default_mode: Optional[str] = None) -> Dict[str, Any]:
+    _isdir_cache.clear()
     ensure_background_defaults()
-    background_directory = args.get('background_directory') if isinstance(args, dict) else None
+    background_directory = args.get('background_directory')
 
     if path is None:
         target = None
@@ -767,6 +957,11 @@ def set_background_directory(path: Optional[str], default_mode: Optional[str] =
         save_current_config()
     return get_background_directory_state()
 
+# config_file()'s answer, keyed on the candidate paths it chose between. Each
+# resolution stats both candidates, and every save resolves it.
+_config_file_cache = None
+
+
 def config_file():
     # In a frozen build app_dir() is sys._MEIPASS — a directory *inside* the
     # application bundle. Configuration must never be read or written there: on
@@ -774,21 +969,38 @@ def config_file():
     # and would invalidate the signature, and the directory is replaced on every
     # upgrade. Only a source checkout may keep a config.json beside the project,
     # which is the portable-install behaviour this branch originally existed for.
+    global _config_file_cache
+
+    app_config_path = None
     if not getattr(sys, 'frozen', False):
         app_config_path = app_dir(CONFIG_FILE_NAME)
-        if app_config_path is not None and os.path.exists(app_config_path):
-            return app_config_path
-
     user_config = config_path(CONFIG_FILE_NAME)
-    if os.path.exists(user_config):
-        return user_config
 
-    demo_config_path = app_dir('democonfig.json')
-    if demo_config_path is not None and os.path.exists(demo_config_path):
+    key = (app_config_path, user_config)
+    cached = _config_file_cache
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    if app_config_path is not None and os.path.exists(app_config_path):
+        resolved = app_config_path
+    elif os.path.exists(user_config):
+        resolved = user_config
+    else:
+        demo_config_path = app_dir('democonfig.json')
+        if demo_config_path is None or not os.path.exists(demo_config_path):
+            # Nothing to seed from, so nothing is settled yet either: leave it
+            # uncached and look again next time rather than remember a file
+            # that does not exist.
+            return user_config
         copyfile(demo_config_path, user_config)
-    return user_config
+        resolved = user_config
+
+    _config_file_cache = (key, resolved)
+    return resolved
 
 def parse_args():
+    import argparse
+
     parser = argparse.ArgumentParser()
     parser.add_argument('-f', '--config-path', help='configuration directory')
     parser.add_argument('-p', '--server-port', help='server port')
@@ -801,6 +1013,7 @@ def parse_args():
 def config():
     global args
     args = parse_args()
+    _reset_path_caches()
     logging_init()
     read_json_config(config_file())
     ensure_discovery_defaults()
@@ -844,10 +1057,64 @@ def config_mix(slots):
 
 _RECONFIG_LOCK = threading.Lock()
 
+# Slot types read_json_config builds a receiver connection for.
+NETWORK_DEVICE_TYPES = frozenset({'uhfr', 'qlxd', 'ulxd', 'axtd', 'p10t'})
+
+
+def _device_layout(slots):
+    """What the devices are built from: everything else in a slot is display."""
+    if not isinstance(slots, list):
+        return None
+    return [
+        (slot.get('slot'), slot.get('type'), slot.get('ip'), slot.get('channel'))
+        for slot in slots if isinstance(slot, dict)
+    ]
+
+
+def _repoint_devices(previous_slots, slots):
+    """Move the live devices onto *slots* without reconnecting anything.
+
+    Only when a rebuild would produce exactly the devices already running:
+    the same slots, types, addresses and channels in the same order, and every
+    device still attached to one of *previous_slots*. Renaming a slot or
+    changing who is on it is by far the most common save, and a full rebuild
+    for it costs the two-second teardown wait in rebuild_from_disk and a
+    reconnect to every receiver. Returns False, touching nothing, whenever that
+    cannot be shown -- the caller then rebuilds.
+    """
+    if config_load_degraded:
+        return False
+    layout = _device_layout(previous_slots)
+    if layout is None or layout != _device_layout(slots):
+        return False
+
+    import shure
+    import offline
+
+    devices = [chan for rx in shure.NetworkDevices for chan in rx.channels]
+    devices.extend(offline.OfflineDevices)
+    replacement = {
+        id(old): new
+        for old, new in zip(
+            (slot for slot in previous_slots if isinstance(slot, dict)),
+            (slot for slot in slots if isinstance(slot, dict)))
+        if old.get('type') in NETWORK_DEVICE_TYPES or old.get('type') == 'offline'
+    }
+    attached = [id(device.cfg) for device in devices]
+    if len(attached) != len(replacement) or set(attached) != set(replacement):
+        return False
+
+    for device in devices:
+        device.cfg = replacement[id(device.cfg)]
+    return True
+
 
 def reconfig(payload):
     """Apply a configuration change and rebuild every device.
 
+    Unless nothing a device is built from has changed, in which case the
+    running devices are moved onto the new slots instead (_repoint_devices).
+
     Runs on a worker thread, not the IOLoop -- it sleeps, and it opens a socket
     per receiver, so on the loop it froze every other request for as long as
     that took. The caller closes the websockets beforehand, because that
@@ -879,6 +1146,7 @@ def _reconfig_locked(payload):
     if discovery_payload is not None:
         normalized = normalize_discovery_settings(discovery_payload)
         config_tree['discovery'] = normalized
+        _normalized_sections['discovery'] = normalized
     else:
         ensure_discovery_defaults()
 
@@ -886,11 +1154,14 @@ def _reconfig_locked(payload):
         logger.warning('Invalid slot payload during reconfig; expected list, got %s', type(slots))
         slots = []
 
+    previous_slots = config_tree.get('slots')
     config_tree['slots'] = config_mix(slots)
 
     # The operator asked for this one, so it writes even after a degraded load,
     # and the file it leaves behind is a real config again.
     save_current_config()
+    if _repoint_devices(previous_slots, config_tree['slots']):
+        return
     config_load_degraded = False
 
     rebuild_from_disk()
@@ -911,6 +1182,9 @@ def rebuild_from_disk():
     # until someone restarted it.
     previous_tree = copy.deepcopy(config_tree)
 
+    import shure
+    import offline
+
     config_tree.clear()
     for device in shure.NetworkDevices:
         # device.socket_disconnect()
@@ -942,22 +1216,99 @@ def rebuild_from_disk():
     for rx in shure.NetworkDevices:
         rx.socket_connect()
 
+# What config.json held the last time this process read or wrote it, as
+# (path, stat signature, fingerprint). Lets a save that would put back exactly
+# the tree already on disk skip the write -- and its fsync -- entirely. Every
+# update_* path saves the whole tree, so most saves change nothing at all.
+_last_disk_state = None
+
+
+def _signature(st):
+    """Enough of a stat to tell whether the file was touched since we saw it.
+
+    The inode is in it because editors commonly save by writing a new file and
+    renaming it over the old one, which can leave size and mtime identical.
+    """
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _stat_signature(path):
+    try:
+        return _signature(os.stat(path))
+    except OSError:
+        return None
+
+
+def _fingerprint(data):
+    """A digest of *data*'s compact rendering, for telling whether a save changes anything.
+
+    json.dumps only uses the C encoder without indent; the indented form
+    config.json is written in goes through the pure-Python one, which is most
+    of what a save costs. Both are the same token stream for the same tree, so
+    comparing this one is as exact as comparing the file text, and the indented
+    rendering is only produced when there is something to write. Kept as a
+    digest so the process does not hold a second copy of the whole config.
+    """
+    rendered = json.dumps(data, separators=(',', ':'), sort_keys=True)
+    return hashlib.blake2b(rendered.encode('utf-8'), digest_size=16).digest()
+
+
+def _remember_disk_state(path, fingerprint, st):
+    """Record what *path* holds, from an fstat of the handle it was read or
+    written through -- the stat the open already paid for, not another lookup.
+    """
+    global _last_disk_state
+    _last_disk_state = (path, _signature(st), fingerprint)
+
+
+def _disk_already_holds(path, fingerprint):
+    """True only when the file is provably still what we last read or wrote.
+
+    The file is the operator's as much as ours -- it is documented as
+    hand-editable -- so an edit made since we last saw it must never be mistaken
+    for our own bytes, or a save would silently leave the edit in place.
+    """
+    state = _last_disk_state
+    if state is None or state[0] != path or state[2] != fingerprint:
+        return False
+    return state[1] == _stat_signature(path)
+
+
+# (package.json path, version). The file ships with the application and does
+# not change while it runs; keyed on the path because app_dir() answers
+# differently for a frozen build.
+_version_cache = None
+
+
 def get_version_number():
+    global _version_cache
     package_json_path = app_dir('package.json')
-    if package_json_path is None or not os.path.exists(package_json_path):
+    cached = _version_cache
+    if cached is not None and cached[0] == package_json_path:
+        return cached[1]
+
+    version = "unknown"
+    if package_json_path is None:
         logger.warning("package.json not found.")
-        return "unknown"
-    with open(package_json_path) as package:
-        pkginfo = json.load(package)
+    else:
+        try:
+            with open(package_json_path) as package:
+                pkginfo = json.load(package)
+        except FileNotFoundError:
+            logger.warning("package.json not found.")
+        else:
+            version = pkginfo.get('version', 'unknown')
 
-    return pkginfo.get('version', 'unknown')
+    _version_cache = (package_json_path, version)
+    return version
 
 def read_json_config(file):
     global config_tree
     global gif_dir
     global config_load_degraded
     with open(file) as config_file:
-        config_tree = json.load(config_file)
+        config_tree = json.loads(config_file.read())
+        _remember_disk_state(file, _fingerprint(config_tree), os.fstat(config_file.fileno()))
 
         # A config with no slots is a board with no receivers, not a reason to
         # refuse to start. This was an unguarded config_tree['slots'], so a
@@ -976,14 +1327,28 @@ def read_json_config(file):
                 file)
             slots = []
 
+        # Imported here rather than at the top: they bring the device layer
+        # with them, which nothing that only reads or saves settings needs.
+        import shure
+        import offline
+
+        # Channels grouped by receiver address first: check_add_network_device
+        # scans every known receiver, and a receiver carries several channels.
+        # Grouping keeps the order receivers and channels were added in, and
+        # the first slot's type for an address still decides the receiver's.
+        by_receiver = {}
         for chan in slots:
-            if chan['type'] in ['uhfr', 'qlxd', 'ulxd', 'axtd', 'p10t']:
-                netDev = shure.check_add_network_device(chan['ip'], chan['type'])
-                netDev.add_channel_device(chan)
+            if chan['type'] in NETWORK_DEVICE_TYPES:
+                by_receiver.setdefault(chan['ip'], []).append(chan)
 
             elif chan['type'] == 'offline':
                 offline.add_device(chan)
 
+        for ip, chans in by_receiver.items():
+            netDev = shure.check_add_network_device(ip, chans[0]['type'])
+            for chan in chans:
+                netDev.add_channel_device(chan)
+
 
     gif_dir = get_gif_dir()
     version = get_version_number()
@@ -1166,6 +1531,13 @@ def write_json_config(data):
     os.replace puts the finished file in place in one step.
     """
     target = config_file()
+    fingerprint = _fingerprint(data)
+    if _disk_already_holds(target, fingerprint):
+        return
+
+    # sort_keys stays. Pre-ordering the tree so it could go would mean rebuilding
+    # dicts that channel objects hold references to, to save about 15% of a
+    # rendering that only runs when something changed.
     payload = json.dumps(data, indent=2, separators=(',', ': '), sort_keys=True)
 
     tmp = '{}.tmp'.format(target)
@@ -1174,6 +1546,9 @@ def write_json_config(data):
             f.write(payload)
             f.flush()
             os.fsync(f.fileno())
+            # A rename keeps the inode and mtime, so this is the signature the
+            # target has once it is in place.
+            written = os.fstat(f.fileno())
 
         os.replace(tmp, target)
     except Exception:
@@ -1185,14 +1560,98 @@ def write_json_config(data):
             pass
         raise
 
+    _remember_disk_state(target, fingerprint, written)
+
+# Per thread, so a transaction on one request cannot hold back a save that
+# another thread is relying on having reached the disk.
+_save_deferral = threading.local()
+
+
+@contextlib.contextmanager
+def config_transaction():
+    """Collapse every save made inside the block into one write at the end.
+
+    A request that applies several updates -- the slot editor posts a list and
+    each entry used to save on its own -- otherwise serialises and fsyncs the
+    whole tree once per entry. Nested blocks write once, when the outermost
+    one ends.
+
+    The write happens even when the block raises, so whatever was applied
+    before the failure is persisted exactly as it was when each update saved
+    for itself.
+
+    Not for anything that reads config.json back before the block ends:
+    reconfig and recover rebuild from the file, and need their save on disk
+    first.
+    """
+    depth = getattr(_save_deferral, 'depth', 0)
+    _save_deferral.depth = depth + 1
+    try:
+        yield
+    finally:
+        _save_deferral.depth = depth
+        if depth == 0 and getattr(_save_deferral, 'pending', False):
+            _save_deferral.pending = False
+            write_json_config(config_tree)
+
+
 def save_current_config():
+    if getattr(_save_deferral, 'depth', 0):
+        _save_deferral.pending = True
+        return None
     return write_json_config(config_tree)
 
+# Number -> position indexes over config_tree['slots'] and ['groups'], kept as
+# (the list indexed, its length, index). config_mix looks every slot of a save
+# up against the stored ones, which as a scan made each save quadratic in the
+# size of the board. The list's identity and length are what keep an index
+# honest: a load or a save replaces the list outright, update_group appends to
+# it, and a position is re-checked before it is trusted. Nothing renumbers an
+# entry in place.
+_slot_index = None
+_group_index = None
+
+
+def _build_index(entries, field):
+    index = {}
+    for position, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            continue
+        try:
+            # setdefault, so the first of any duplicates wins, as it did when
+            # this was a scan.
+            index.setdefault(entry.get(field), position)
+        except TypeError:
+            continue
+    return (entries, len(entries), index)
+
+
+def _indexed_lookup(cached, entries, field, number):
+    """Find the entry whose *field* equals *number*. Returns (entry, index)."""
+    if cached is None or cached[0] is not entries or cached[1] != len(entries):
+        cached = _build_index(entries, field)
+    try:
+        position = cached[2].get(number)
+    except TypeError:
+        return None, cached
+    if position is None:
+        return None, cached
+
+    entry = entries[position]
+    if isinstance(entry, dict) and entry.get(field) == number:
+        return entry, cached
+
+    # Moved under us after all; one rebuild settles it.
+    cached = _build_index(entries, field)
+    position = cached[2].get(number)
+    return (entries[position] if position is not None else None), cached
+
+
 def get_group_by_number(group_number):
-    for group in config_tree['groups']:
-        if group['group'] == int(group_number):
-            return group
-    return None
+    global _group_index
+    group, _group_index = _indexed_lookup(
+        _group_index, config_tree['groups'], 'group', int(group_number))
+    return group
 
 def update_group(data):
     group_update_list.append(data)
@@ -1212,10 +1671,10 @@ def get_slot_by_number(slot_number):
     # .get, because config_mix calls this while merging a save against the
     # loaded tree, which -- on a board that started from a config with no slots
     # -- does not have the key yet.
-    for slot in config_tree.get('slots') or []:
-        if slot['slot'] == slot_number:
-            return slot
-    return None
+    global _slot_index
+    slot, _slot_index = _indexed_lookup(
+        _slot_index, config_tree.get('slots') or [], 'slot', slot_number)
+    return slot
 
 def update_slot(data):
     slot_cfg = get_slot_by_number(data['slot'])
@@ -1253,11 +1712,22 @@ def update_slot(data):
 
 
 def _normalized_slot_set(slots):
-    if slots is None:
-        return {slot_cfg.get('slot') for slot_cfg in config_tree.get('slots', []) if slot_cfg.get('slot') is not None}
+    if isinstance(slots, int):
+        return {int(slots)}
+    if isinstance(slots, str):
+        # One number, not a sequence of digits: iterating '12' used to clear
+        # slots 1 and 2.
+        try:
+            return {int(slots)}
+        except ValueError:
+            return set()
+
     target = set()
     try:
         for entry in slots:
+            if type(entry) is int:
+                target.add(entry)
+                continue
             try:
                 target.add(int(entry))
             except (TypeError, ValueError):
@@ -1277,19 +1747,28 @@ def clear_device_names(slots=None):
     list of slot numbers that were updated. Extended name data is preserved.
     """
 
-    target_slots = _normalized_slot_set(slots)
-    if not target_slots:
-        return []
+    if slots is None:
+        # Every slot, which needs no set to test against at all.
+        targets = [
+            slot_cfg for slot_cfg in config_tree.get('slots', [])
+            if slot_cfg.get('slot') is not None
+        ]
+    else:
+        # Only the slots asked for, looked up by number the way every other
+        # edit finds a slot, rather than scanning the board to clear one.
+        targets = []
+        for slot_num in sorted(_normalized_slot_set(slots)):
+            slot_cfg = get_slot_by_number(slot_num)
+            if slot_cfg is not None:
+                targets.append(slot_cfg)
 
     cleared = []
     dirty = False
-    for slot_cfg in config_tree.get('slots', []):
-        slot_num = slot_cfg.get('slot')
-        if slot_num in target_slots and 'chan_name_raw' in slot_cfg:
-            slot_cfg.pop('chan_name_raw', None)
+    for slot_cfg in targets:
+        cleared.append(slot_cfg.get('slot'))
+        if 'chan_name_raw' in slot_cfg:
+            del slot_cfg['chan_name_raw']
             dirty = True
-        if slot_num in target_slots:
-            cleared.append(slot_num)
 
     if dirty:
         save_current_config()
@@ -1302,7 +1781,10 @@ def update_pco_config(pco_data: Any) -> Tuple[Dict[str, Any], CredentialMeta]:
         raise CredentialError('Invalid PCO configuration payload')
 
     existing = config_tree.get('pco') if isinstance(config_tree.get('pco'), dict) else {}
-    merged: Dict[str, Any] = copy.deepcopy(existing) if existing else {}
+    # One level is enough: every key below is replaced outright, never edited in
+    # place -- apply_auth_update and CredentialMeta assign a fresh 'auth' -- and
+    # the old block is dropped from the tree once merged takes its place.
+    merged: Dict[str, Any] = dict(existing)
 
     # Apply non-auth fields first to preserve ancillary configuration updates.
     for key, value in pco_data.items():
@@ -1372,6 +1854,7 @@ def get_public_pco_config() -> Dict[str, Any]:
     if not isinstance(pco_cfg, dict):
         return {'auth': public_auth_view({})}
 
-    payload = copy.deepcopy(pco_cfg)
+    # The stored auth block is replaced below, so it is not worth copying.
+    payload = {key: None if key == 'auth' else _json_clone(value) for key, value in pco_cfg.items()}
     payload['auth'] = public_auth_view(pco_cfg)
     return payload
@@ -1,19 +1,23 @@
 import contextlib
-import copy
+import errno
+import functools
 import ipaddress
+import itertools
 import json
 import logging
 import os
 import platform
 import re
+import selectors
 import socket
 import struct
 import sys
 import threading
 import time
+from bisect import bisect_left
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from optparse import OptionParser
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import xml.etree.ElementTree as ET
 
@@ -28,9 +32,38 @@ PROBE_COMMANDS = [
     b'< GET 1 ALL >\r\n',
     b'< GET DEVICE_ID >\r\n',
 ]
+# The two DEVICE_ID queries go out in one write, so a device that knows only
+# the second no longer costs a timeout on the first. Receivers that know both
+# -- ULX-D, QLX-D and AD do -- answer both; the replies are a few bytes each.
+_PROBE_IDENTIFY = PROBE_COMMANDS[0] + PROBE_COMMANDS[2]
+# GET 1 ALL makes a receiver dump its whole state, so it is sent only when
+# neither DEVICE_ID query drew an answer, as before they were pipelined.
+_PROBE_FALLBACK = PROBE_COMMANDS[1]
+# As much of a reply as is read before giving up on it; one recv's worth, as
+# when each command was sent on its own.
+PROBE_REPLY_LIMIT = 4096
+# How much of whatever else has already arrived is read off before closing.
+# Closing with data still unread sends the receiver a reset.
+PROBE_DISCARD_LIMIT = 65536
 MAX_PROBE_WORKERS = 24
+# Connects in flight at once during a sweep. Bounded by descriptors, not
+# threads: macOS starts processes with a limit of 256 and select() on Windows
+# handles at most 512, and the web server needs some of those too.
+MAX_PENDING_CONNECTS = 128
+# connect_ex results that mean "still connecting" rather than "failed".
+_CONNECT_IN_PROGRESS = frozenset(code for code in (
+    errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY,
+    getattr(errno, 'WSAEWOULDBLOCK', None),
+) if code is not None)
 MAX_HOSTS_PER_SUBNET = 1024
 SLP_SOCKET_TIMEOUT = 1.0
+# Datagrams read per wake-up once one has arrived. Announcements come in bursts
+# -- every receiver on a network answers the same query -- so one wake-up can
+# take the whole burst.
+MULTICAST_BATCH = 64
+# Asked for, not guaranteed: the kernel caps it (net.core.rmem_max on Linux).
+# A larger queue is what keeps a burst from being dropped while a scan runs.
+MULTICAST_RCVBUF = 1 << 20
 ACTIVE_SCAN_TTL = 180
 DEFAULT_DCID_XML = '/Applications/Shure Update Utility.app/Contents/Resources/DCIDMap.xml'
 FALLBACK_DISCOVERY_SETTINGS = {
@@ -63,15 +96,25 @@ scan_status: Dict[str, Any] = {
 scan_status_lock = threading.Lock()
 
 
+def _clone_flat(source: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a dict of scalars and lists of scalars.
+
+    The discovery settings and scan status are only ever that shape, and this
+    runs on every pass of the discovery loop, where deepcopy's generic walk
+    was the bulk of the cost.
+    """
+    return {key: list(value) if isinstance(value, list) else value for key, value in source.items()}
+
+
 def get_scan_status() -> Dict[str, Any]:
     with scan_status_lock:
-        return copy.deepcopy(scan_status)
+        return _clone_flat(scan_status)
 
 
 def _record_scan(networks: List[str]) -> None:
     global scan_status
-    with discovered_lock:
-        found = len(discovered)
+    # A single len() needs no lock, and the scan is done writing by now.
+    found = len(discovered)
     with scan_status_lock:
         scan_status = {
             'has_scanned': True,
@@ -124,7 +167,8 @@ def _update_dcid_status(source_path: Optional[str]) -> None:
 
 
 def get_dcid_status() -> Dict[str, Any]:
-    return copy.deepcopy(dcid_status)
+    # Strings and booleans only.
+    return dict(dcid_status)
 
 logger = logging.getLogger('micboard.discovery')
 
@@ -132,6 +176,14 @@ logger = logging.getLogger('micboard.discovery')
 deviceList: Dict[str, Dict[str, str]] = {}
 discovered: List[Dict[str, Any]] = []
 discovered_lock = threading.Lock()
+# (list, {ip: entry}, sorted ips) for the list it was built from. Rebuilt
+# whenever `discovered` is a different list or a different length than the
+# index remembers, which covers both pruning and tests swapping the list out.
+_discovered_index: Optional[Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], List[str]]] = None
+# (list, copies of its entries) -- what the web handlers read. Writers replace
+# the whole tuple under discovered_lock; readers take the reference without
+# the lock, so polling the discovery page never holds up a multicast packet.
+_discovered_snapshot: Tuple[Optional[List[Dict[str, Any]]], Tuple[Dict[str, Any], ...]] = (None, ())
 
 
 def discover() -> None:
@@ -148,6 +200,11 @@ def discover() -> None:
             logger.warning('Failed to load DCID map from %s', dcid_path, exc_info=True)
     _update_dcid_status(dcid_path if isinstance(dcid_path, str) else None)
 
+    # Sweeps take seconds; announcements arriving meanwhile used to wait in the
+    # socket buffer, or be dropped once it filled. Daemon so that Ctrl+C on
+    # `discover.py --discover` still exits.
+    threading.Thread(target=_scan_forever, name='discovery-scan', daemon=True).start()
+
     while True:
         try:
             _discovery_loop()
@@ -156,20 +213,28 @@ def discover() -> None:
             time.sleep(5)
 
 
+def _scan_forever() -> None:
+    while True:
+        interval = 60
+        try:
+            settings = _get_discovery_settings()
+            interval = max(int(settings.get('scan_interval', 60)), 15)
+            try:
+                _run_active_scan(settings)
+            except Exception:
+                logger.exception('Active discovery scan failed')
+            _prune_discovered(max(interval * 3, ACTIVE_SCAN_TTL))
+        except Exception:
+            logger.exception('Discovery scan loop error; next attempt in %d seconds', interval)
+        time.sleep(interval)
+
+
 def _discovery_loop() -> None:
     with contextlib.closing(_open_multicast_socket()) as sock:
-        next_scan_at = 0.0
+        sock.settimeout(SLP_SOCKET_TIMEOUT)
         while True:
-            settings = _get_discovery_settings()
-            now = time.time()
-            if next_scan_at == 0.0:
-                next_scan_at = now
-            deadline = max(0.0, next_scan_at - now)
-            timeout = min(SLP_SOCKET_TIMEOUT, deadline) if deadline > 0 else SLP_SOCKET_TIMEOUT
-
             ip = ''
             try:
-                sock.settimeout(timeout)
                 data, (ip, _) = sock.recvfrom(4096)
             except socket.timeout:
                 data = None
@@ -180,15 +245,38 @@ def _discovery_loop() -> None:
 
             if data:
                 _handle_multicast_packet(data, ip)
+                for data, ip in _drain_multicast(sock):
+                    _handle_multicast_packet(data, ip)
 
-            if time.time() >= next_scan_at:
-                try:
-                    _run_active_scan(settings)
-                except Exception:
-                    logger.exception('Active discovery scan failed')
-                next_scan_at = time.time() + max(int(settings.get('scan_interval', 60)), 15)
-                ttl = max(settings.get('scan_interval', 60) * 3, ACTIVE_SCAN_TTL)
-                _prune_discovered(ttl)
+
+def _drain_multicast(sock: socket.socket) -> List[Tuple[bytes, str]]:
+    """Read the datagrams already queued on *sock*, without waiting for more.
+
+    Python has no recvmmsg, so this is the nearest thing: non-blocking reads
+    until the queue is empty, at most MULTICAST_BATCH of them. The socket is
+    switched to non-blocking for the duration rather than passing
+    MSG_DONTWAIT, because a socket with a timeout waits for readability
+    before it even tries the read -- so the flag alone still sat out the
+    whole timeout once the queue was empty. It also works where the flag
+    does not exist (Windows).
+    """
+    batch: List[Tuple[bytes, str]] = []
+    previous = sock.gettimeout()
+    sock.settimeout(0.0)
+    try:
+        for _ in range(MULTICAST_BATCH - 1):
+            try:
+                data, (ip, _) = sock.recvfrom(4096)
+            except BlockingIOError:
+                break
+            except OSError as exc:
+                logger.debug('Multicast drain stopped: %s', exc)
+                break
+            if data:
+                batch.append((data, ip))
+    finally:
+        sock.settimeout(previous)
+    return batch
 
 
 def _get_discovery_settings() -> Dict[str, Any]:
@@ -200,12 +288,12 @@ def _get_discovery_settings() -> Dict[str, Any]:
             logger.debug('Falling back to default discovery settings', exc_info=True)
         else:
             if isinstance(result, dict):
-                return copy.deepcopy(result)
+                return _clone_flat(result)
 
     defaults = getattr(config, 'DEFAULT_DISCOVERY_SETTINGS', None)
     if isinstance(defaults, dict):
-        return copy.deepcopy(defaults)
-    return copy.deepcopy(FALLBACK_DISCOVERY_SETTINGS)
+        return _clone_flat(defaults)
+    return _clone_flat(FALLBACK_DISCOVERY_SETTINGS)
 
 
 def _config_int(name: str, default: int) -> int:
@@ -226,6 +314,10 @@ def _open_multicast_socket() -> socket.socket:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     except (AttributeError, OSError):
         logger.debug('Unable to set SO_REUSEPORT on discovery socket (unsupported on this platform)', exc_info=True)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MULTICAST_RCVBUF)
+    except OSError:
+        logger.debug('Unable to enlarge the discovery socket receive buffer', exc_info=True)
     try:
         sock.bind((MCAST_GRP, MCAST_PORT))
     except OSError:
@@ -236,13 +328,7 @@ def _open_multicast_socket() -> socket.socket:
 
 
 def _handle_multicast_packet(raw_payload: bytes, ip: str) -> None:
-    try:
-        payload = raw_payload.decode('utf-8', errors='ignore')
-    except Exception:
-        logger.debug('Unable to decode discovery payload from %s', ip)
-        return
-
-    dcid = dcid_find(payload)
+    dcid = dcid_find(raw_payload)
     device = dcid_get(dcid)
     lookup = dcid_model_lookup(device['model']) if device else None
     rx_type, channels = lookup if lookup else (None, None)
@@ -309,20 +395,16 @@ def _candidate_subnets(settings: Dict[str, Any]) -> List[ipaddress.IPv4Network]:
     manual = settings.get('subnets') or []
     for entry in manual:
         try:
-            network = ipaddress.ip_network(entry, strict=False)
-        except ValueError:
-            logger.warning('Skipping invalid discovery subnet %s', entry)
-            continue
-
-        if network.version != 4:
-            logger.warning('Skipping non-IPv4 discovery subnet %s', entry)
-            continue
-
-        if network.num_addresses > MAX_HOSTS_PER_SUBNET:
-            logger.warning('Skipping discovery subnet %s (%s hosts)', network, network.num_addresses)
+            parsed = _parse_manual_subnet(entry)
+        except TypeError:
+            # Unhashable, so not cacheable; ipaddress rejects it anyway.
+            parsed = ('Skipping invalid discovery subnet %s', (entry,))
+        if isinstance(parsed, tuple):
+            # Warned about on every scan, as before; only the parsing is cached.
+            message, args = parsed
+            logger.warning(message, *args)
             continue
-
-        candidates.append(network)
+        candidates.append(parsed)
 
     if settings.get('auto', True):
         candidates.extend(_auto_detect_subnets())
@@ -338,6 +420,23 @@ def _candidate_subnets(settings: Dict[str, Any]) -> List[ipaddress.IPv4Network]:
     return result
 
 
+@functools.lru_cache(maxsize=64)
+def _parse_manual_subnet(entry: Any) -> Any:
+    """The IPv4 network *entry* names, or (message, args) saying why not."""
+    try:
+        network = ipaddress.ip_network(entry, strict=False)
+    except ValueError:
+        return 'Skipping invalid discovery subnet %s', (entry,)
+
+    if network.version != 4:
+        return 'Skipping non-IPv4 discovery subnet %s', (entry,)
+
+    if network.num_addresses > MAX_HOSTS_PER_SUBNET:
+        return 'Skipping discovery subnet %s (%s hosts)', (network, network.num_addresses)
+
+    return network
+
+
 def _auto_detect_subnets() -> List[ipaddress.IPv4Network]:
     subnets: List[ipaddress.IPv4Network] = []
     ip_addr = _default_interface_ip()
@@ -352,7 +451,25 @@ def _auto_detect_subnets() -> List[ipaddress.IPv4Network]:
     return subnets
 
 
+# How long the default interface address is trusted. Long enough to cover a
+# scan and its neighbours, short enough to follow a machine that changes
+# networks.
+INTERFACE_IP_TTL = 60.0
+_interface_ip_cache: Optional[Tuple[float, Optional[str]]] = None
+
+
 def _default_interface_ip() -> Optional[str]:
+    global _interface_ip_cache
+    cached = _interface_ip_cache
+    now = time.monotonic()
+    if cached is not None and now < cached[0]:
+        return cached[1]
+    address = _lookup_interface_ip()
+    _interface_ip_cache = (now + INTERFACE_IP_TTL, address)
+    return address
+
+
+def _lookup_interface_ip() -> Optional[str]:
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock_obj:
             sock_obj.connect(('8.8.8.8', 80))
@@ -365,46 +482,149 @@ def _default_interface_ip() -> Optional[str]:
 
 
 def _probe_network(network: ipaddress.IPv4Network, timeout: float) -> None:
-    hosts = [str(host) for host in network.hosts()]
+    # Every address, not just the ones in the ARP cache: a receiver nobody on
+    # this machine has talked to yet is exactly what a sweep is for.
+    hosts = [str(host) for host in itertools.islice(network.hosts(), MAX_HOSTS_PER_SUBNET)]
     if not hosts:
         return
-    if len(hosts) > MAX_HOSTS_PER_SUBNET:
-        hosts = hosts[:MAX_HOSTS_PER_SUBNET]
-    workers = min(MAX_PROBE_WORKERS, max(1, len(hosts)))
-    logger.debug('Active scan on %s with %d hosts (workers=%d)', network, len(hosts), workers)
+    logger.debug('Active scan on %s with %d hosts', network, len(hosts))
+
+    # Nearly every address on a sweep never answers, and each of those used to
+    # hold one of the pool's threads for the whole timeout. Connecting is now
+    # done all at once from this thread; only the hosts that accepted are
+    # handed to the pool for the request/reply exchange.
+    connected = _connect_all(hosts, timeout)
+    if not connected:
+        return
+    logger.debug('%d hosts on %s accepted a connection', len(connected), network)
+
+    executor = _get_probe_executor()
+    futures = {}
+    for position, (host_ip, conn, started) in enumerate(connected):
+        try:
+            futures[executor.submit(_probe_connected, conn, host_ip, started, timeout)] = host_ip
+        except RuntimeError as exc:
+            logger.debug('Stopping probe scheduling: %s', exc)
+            for _, unused, _ in connected[position:]:
+                unused.close()
+            raise
+
+    for future in as_completed(futures):
+        ip = futures[future]
+        try:
+            result = future.result()
+        except Exception as exc:
+            logger.debug('Probe error for %s: %s', ip, exc)
+            continue
+        if not result:
+            continue
+        add_rx_to_dlist(
+            result.get('ip', ip),
+            rx_type=result.get('type'),
+            channels=result.get('channels'),
+            model=result.get('model'),
+            band=result.get('band'),
+            dcid=result.get('dcid'),
+            source=result.get('source', 'active'),
+            reachable=result.get('reachable', True),
+        )
+
+
+_probe_executor: Optional[ThreadPoolExecutor] = None
+_probe_executor_lock = threading.Lock()
+
+
+def _get_probe_executor() -> ThreadPoolExecutor:
+    """The pool probe exchanges run on, kept for the life of the process.
+
+    Its threads are started as work needs them and then stay, so each sweep
+    does not spawn and join a fresh set. concurrent.futures joins them at
+    interpreter exit, and refuses new work from then on with RuntimeError --
+    which _run_active_scan already treats as shutdown.
+    """
+    global _probe_executor
+    with _probe_executor_lock:
+        if _probe_executor is None:
+            _probe_executor = ThreadPoolExecutor(max_workers=MAX_PROBE_WORKERS, thread_name_prefix='probe')
+        return _probe_executor
+
+
+def _connect_all(hosts: List[str], timeout: float) -> List[Tuple[str, socket.socket, float]]:
+    """Open a connection to PROBE_PORT on every host that accepts one.
+
+    Returns (ip, connected socket, time.monotonic() when the connect started)
+    for each, with the socket back in timeout mode. At most MAX_PENDING_CONNECTS are outstanding;
+    as they connect, fail or time out, the next hosts are started.
+    """
+    connected: List[Tuple[str, socket.socket, float]] = []
+    next_host = 0
+    # Insertion order is start order, so the first entry is always the next
+    # to time out.
+    in_flight: Dict[socket.socket, Tuple[str, float]] = {}
+    # A socket opened but not yet in in_flight or connected.
+    pending: Optional[socket.socket] = None
 
     try:
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {}
-            for host_ip in hosts:
-                try:
-                    futures[executor.submit(_probe_ip, host_ip, timeout)] = host_ip
-                except RuntimeError as exc:
-                    logger.debug('Stopping probe scheduling: %s', exc)
-                    raise
-
-            for future in as_completed(futures):
-                ip = futures[future]
-                try:
-                    result = future.result()
-                except Exception as exc:
-                    logger.debug('Probe error for %s: %s', ip, exc)
-                    continue
-                if not result:
-                    continue
-                add_rx_to_dlist(
-                    result.get('ip', ip),
-                    rx_type=result.get('type'),
-                    channels=result.get('channels'),
-                    model=result.get('model'),
-                    band=result.get('band'),
-                    dcid=result.get('dcid'),
-                    source=result.get('source', 'active'),
-                    reachable=result.get('reachable', True),
-                )
-    except RuntimeError:
+        with selectors.DefaultSelector() as selector:
+            while True:
+                while next_host < len(hosts) and len(in_flight) < MAX_PENDING_CONNECTS:
+                    ip = hosts[next_host]
+                    try:
+                        pending = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    except OSError as exc:
+                        # Out of descriptors. Wait for the ones in flight to free
+                        # some; with none in flight there is nothing to wait for.
+                        logger.debug('Unable to open a probe socket for %s: %s', ip, exc)
+                        if not in_flight:
+                            next_host = len(hosts)
+                        break
+                    next_host += 1
+                    pending.setblocking(False)
+                    result = pending.connect_ex((ip, PROBE_PORT))
+                    sock, pending = pending, None
+                    if result == 0:
+                        sock.settimeout(timeout)
+                        connected.append((ip, sock, time.monotonic()))
+                    elif result in _CONNECT_IN_PROGRESS:
+                        in_flight[sock] = (ip, time.monotonic())
+                        selector.register(sock, selectors.EVENT_WRITE)
+                    else:
+                        sock.close()
+
+                if not in_flight:
+                    break
+
+                oldest = next(iter(in_flight.values()))[1]
+                for key, _ in selector.select(max(0.0, oldest + timeout - time.monotonic())):
+                    sock = key.fileobj
+                    selector.unregister(sock)
+                    # Checked before leaving in_flight, so a failure here still
+                    # leaves the socket where the cleanup below will find it.
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    ip, started = in_flight.pop(sock)
+                    if error == 0:
+                        sock.settimeout(timeout)
+                        connected.append((ip, sock, started))
+                    else:
+                        sock.close()
+
+                now = time.monotonic()
+                while in_flight:
+                    sock, (ip, started) = next(iter(in_flight.items()))
+                    if now - started < timeout:
+                        break
+                    selector.unregister(sock)
+                    del in_flight[sock]
+                    sock.close()
+    except BaseException:
+        # Nothing reaches the caller, so nothing opened here may outlive it.
+        leftovers = itertools.chain(in_flight, (sock for _, sock, _ in connected), [pending] if pending else [])
+        for sock in leftovers:
+            sock.close()
         raise
 
+    return connected
+
 
 # Shure devices answer "< GET 1 DEVICE_ID >" with a framed reply such as
 # "< REP 1 DEVICE_ID {ULXD4} >". UHF-R terminates with * rather than >.
@@ -428,27 +648,26 @@ def looks_like_shure_reply(payload: str) -> bool:
     return False
 
 
-def _probe_ip(ip: str, timeout: float) -> Optional[Dict[str, Any]]:
-    """Identify a receiver at *ip*, or return None with the reason logged.
+def _probe_connected(conn: socket.socket, ip: str, start: float,
+                     timeout: float) -> Optional[Dict[str, Any]]:
+    """Identify the receiver on *conn*, or return None with the reason logged.
 
     Returning None is the common case on any real network. A device is only
     reported when it answers as a Shure device *and* resolves to a receiver
     type this application can actually drive -- see _is_supported_receiver.
+
+    Closes *conn*, a connection _connect_all opened. *start* is
+    time.monotonic() when the connect began, for rtt_ms.
     """
-    start = time.time()
     try:
-        with socket.create_connection((ip, PROBE_PORT), timeout=timeout) as conn:
+        with conn:
             conn.settimeout(timeout)
-            payload = ''
-            for command in PROBE_COMMANDS:
-                try:
-                    conn.sendall(command)
-                    data = conn.recv(4096)
-                    if data:
-                        payload = data.decode('utf-8', errors='ignore')
-                        break
-                except socket.timeout:
-                    continue
+            conn.sendall(_PROBE_IDENTIFY)
+            payload = _read_probe_reply(conn, timeout)
+            if not payload:
+                conn.sendall(_PROBE_FALLBACK)
+                payload = _read_probe_reply(conn, timeout)
+            _discard_queued(conn)
 
             if not looks_like_shure_reply(payload):
                 logger.debug(
@@ -466,12 +685,60 @@ def _probe_ip(ip: str, timeout: float) -> Optional[Dict[str, Any]]:
             info['ip'] = ip
             info['source'] = 'active'
             info['reachable'] = True
-            info['rtt_ms'] = int((time.time() - start) * 1000)
+            info['rtt_ms'] = int((time.monotonic() - start) * 1000)
             return info
     except (socket.timeout, ConnectionError, OSError):
         return None
 
 
+def _read_probe_reply(conn: socket.socket, timeout: float) -> str:
+    """Read until a whole Shure frame has arrived, or the timeout runs out.
+
+    A frame can arrive split across reads; the first read alone used to be
+    all that was looked at.
+    """
+    received = bytearray()
+    deadline = time.monotonic() + timeout
+    while len(received) < PROBE_REPLY_LIMIT:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        conn.settimeout(remaining)
+        try:
+            data = conn.recv(PROBE_REPLY_LIMIT - len(received))
+        except socket.timeout:
+            break
+        if not data:
+            break
+        received += data
+        text = received.decode('utf-8', errors='ignore')
+        # Framed and closed: "< REP ... >", or "* REPORT ... *" from UHF-R.
+        if text.rstrip().endswith(('>', '*')) and looks_like_shure_reply(text):
+            break
+    return received.decode('utf-8', errors='ignore')
+
+
+def _discard_queued(conn: socket.socket) -> None:
+    """Read off, without waiting, what has arrived beyond the reply used.
+
+    A receiver that answered both DEVICE_ID queries has a second reply queued,
+    and closing on unread data resets the connection rather than ending it.
+    A reply still in transit is not waited for.
+    """
+    # Non-blocking rather than MSG_DONTWAIT: a socket with a timeout waits for
+    # it to be readable before every recv, flag or not.
+    conn.settimeout(0.0)
+    discarded = 0
+    while discarded < PROBE_DISCARD_LIMIT:
+        try:
+            data = conn.recv(PROBE_DISCARD_LIMIT - discarded)
+        except OSError:
+            return
+        if not data:
+            return
+        discarded += len(data)
+
+
 def _is_supported_receiver(info: Dict[str, Any]) -> bool:
     """Whether the parsed device resolves to a driveable receiver type.
 
@@ -509,10 +776,53 @@ def _parse_probe_payload(payload: str) -> Dict[str, Any]:
     return info
 
 
+# A whole whitespace-separated token that is a UUID, allowing the same
+# punctuation around it and the same optional "cd:" prefix the token loop in
+# _extract_dcid_from_text strips. Every DCID Shure ships is a UUID.
+_DCID_TOKEN_RE = re.compile(
+    r'(?<!\S)[<>";,]*(?:cd:)?'
+    r'([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})'
+    r'[<>";,]*(?!\S)',
+    re.IGNORECASE)
+_UUID_RE = re.compile(r'[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}')
+_DCID_STRIP = ' <>"\r\n\t;,'
+# (map, size, regex is enough) for the map last checked.
+_dcid_key_shape: Optional[Tuple[Dict[str, Dict[str, str]], int, bool]] = None
+
+
+def _dcid_key_fits_regex(key: str) -> bool:
+    """Whether the regex finds *key* exactly when the token loop would.
+
+    True for a UUID, and for a key the token loop could never produce at all
+    -- the bundled map has one with a stray quote on the end.
+    """
+    if _UUID_RE.fullmatch(key):
+        return True
+    return bool(key) and (key != key.upper() or key != key.strip(_DCID_STRIP) or len(key.split()) != 1)
+
+
+def _dcid_keys_are_uuids() -> bool:
+    global _dcid_key_shape
+    shape = _dcid_key_shape
+    if shape is None or shape[0] is not deviceList or shape[1] != len(deviceList):
+        shape = (deviceList, len(deviceList), all(_dcid_key_fits_regex(key) for key in deviceList))
+        _dcid_key_shape = shape
+    return shape[2]
+
+
 def _extract_dcid_from_text(data: str) -> Optional[str]:
     if not data:
         return None
-    possible_tokens = [token.strip(' <>\"\r\n\t;,') for token in data.replace('cd:', 'cd:').split()]
+    if _dcid_keys_are_uuids():
+        # One regex pass instead of splitting, stripping and upper-casing
+        # every token of the reply.
+        for match in _DCID_TOKEN_RE.finditer(data):
+            candidate = match.group(1).upper()
+            if candidate in deviceList:
+                return candidate
+        return None
+    # A map converted from some other DCIDMap.xml may not be all UUIDs.
+    possible_tokens = [token.strip(_DCID_STRIP) for token in data.replace('cd:', 'cd:').split()]
     for token in possible_tokens:
         candidate = token.upper()
         if candidate.startswith('CD:'):
@@ -541,15 +851,27 @@ def add_rx_to_dlist(ip: str, rx_type: Optional[str] = None, channels: Optional[i
                     model: Optional[str] = None, band: Optional[str] = None,
                     dcid: Optional[str] = None, source: str = 'slp',
                     reachable: bool = True) -> None:
+    global _discovered_snapshot
     now = time.time()
     with discovered_lock:
-        entry = next((item for item in discovered if item['ip'] == ip), None)
-        if entry is None:
+        by_ip, ips = _discovered_lookup()
+        entry = by_ip.get(ip)
+        added = entry is None
+        # Where the entry is, or goes: the list is kept in ip order.
+        position = bisect_left(ips, ip)
+        if added:
             entry = {
                 'ip': ip,
                 'channel': 1,
             }
-            discovered.append(entry)
+            # Slots follow IP order, so only a new receiver moves anyone: the
+            # ones sorted after it shift up by one. Updates, the usual case,
+            # leave every slot where it is.
+            ips.insert(position, ip)
+            by_ip[ip] = entry
+            discovered.insert(position, entry)
+            for idx in range(position, len(discovered)):
+                discovered[idx]['slot'] = idx + 1
 
         if rx_type:
             entry['type'] = rx_type
@@ -574,37 +896,83 @@ def add_rx_to_dlist(ip: str, rx_type: Optional[str] = None, channels: Optional[i
         entry['source'] = source
         entry['reachable'] = reachable
         entry['timestamp'] = now
-        entry.setdefault('slot', discovered.index(entry) + 1)
 
+        # Only the changed entry is copied -- or, for a new receiver, it and
+        # the ones whose slots moved.
+        previous = _discovered_snapshot[1]
+        if added:
+            changed = tuple(dict(item) for item in discovered[position:])
+            _discovered_snapshot = (discovered, previous[:position] + changed)
+        else:
+            _discovered_snapshot = (discovered, previous[:position] + (dict(entry),) + previous[position + 1:])
+
+
+def _discovered_lookup() -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Return the ip index of `discovered`, rebuilding it if it is stale.
+
+    Call with discovered_lock held. A rebuild also re-sorts and renumbers the
+    list, which is what every add used to do.
+    """
+    global _discovered_index, _discovered_snapshot
+    cached = _discovered_index
+    if cached is None or cached[0] is not discovered or len(cached[2]) != len(discovered):
         discovered.sort(key=lambda item: item['ip'])
         for idx, item in enumerate(discovered, start=1):
             item['slot'] = idx
+        by_ip = {item['ip']: item for item in discovered}
+        cached = (discovered, by_ip, [item['ip'] for item in discovered])
+        _discovered_index = cached
+        _discovered_snapshot = (discovered, tuple(dict(item) for item in discovered))
+    return cached[1], cached[2]
 
 
 def _prune_discovered(ttl: float) -> None:
+    global _discovered_index
     cutoff = time.time() - ttl
     with discovered_lock:
         before = len(discovered)
         discovered[:] = [entry for entry in discovered if entry.get('timestamp', 0) >= cutoff]
         if before != len(discovered):
             logger.debug('Pruned %d stale discovery entries', before - len(discovered))
+            _discovered_index = None
+            _discovered_lookup()
 
 
 def time_filterd_discovered_list(ttl: float = ACTIVE_SCAN_TTL) -> List[Dict[str, Any]]:
-    cutoff = time.time() - ttl
-    with discovered_lock:
-        snapshot = [dict(entry) for entry in discovered if entry.get('timestamp', 0) >= cutoff]
-        for entry in snapshot:
-            entry['age'] = max(0, time.time() - entry.get('timestamp', 0))
-        return snapshot
-
-
-def dcid_find(data: str) -> str:
-    dcid = ''
-    for segment in data.split(','):
-        segment = segment.strip('()')
-        if 'cd:' in segment:
-            dcid = segment.split('cd:')[-1]
+    owner, snapshot = _discovered_snapshot
+    if owner is not discovered:
+        # Never written through add_rx_to_dlist yet, or replaced wholesale.
+        with discovered_lock:
+            _discovered_lookup()
+            owner, snapshot = _discovered_snapshot
+    now = time.time()
+    cutoff = now - ttl
+    return [
+        {**entry, 'age': max(0, now - entry.get('timestamp', 0))}
+        for entry in snapshot
+        if entry.get('timestamp', 0) >= cutoff
+    ]
+
+
+def dcid_find(data: Union[str, bytes]) -> str:
+    """The DCID in an SLP announcement: whatever follows the last "cd:",
+    up to the next comma, without trailing parentheses.
+
+    Takes the raw datagram as well as text, so a multicast packet is searched
+    as bytes and only the DCID itself is decoded.
+    """
+    if isinstance(data, bytes):
+        marker, comma, parens = b'cd:', b',', b'()'
+    else:
+        marker, comma, parens = 'cd:', ',', '()'
+    start = data.rfind(marker)
+    if start < 0:
+        return ''
+    start += len(marker)
+    end = data.find(comma, start)
+    dcid = (data[start:] if end < 0 else data[start:end]).rstrip(parens)
+    if isinstance(dcid, bytes):
+        return dcid.decode('utf-8', errors='ignore')
     return dcid
 
 
@@ -614,37 +982,69 @@ def dcid_get(dcid: Optional[str]) -> Optional[Dict[str, str]]:
     return deviceList.get(dcid)
 
 
+def _build_model_index() -> Dict[str, Tuple[str, Any]]:
+    """Map every DCID model name in BASE_CONST to (receiver type, value).
+
+    If two types ever list the same model, the first in BASE_CONST order wins,
+    as it did when dcid_model_lookup walked the table.
+    """
+    index: Dict[str, Tuple[str, Any]] = {}
+    for type_key, type_value in BASE_CONST.items():
+        for model_key, model_value in type_value['DCID_MODEL'].items():
+            index.setdefault(model_key, (type_key, model_value))
+    return index
+
+
+# BASE_CONST is fixed at import; call _rebuild_model_index after changing it.
+_MODEL_INDEX = _build_model_index()
+
+
+def _rebuild_model_index() -> None:
+    global _MODEL_INDEX
+    _MODEL_INDEX = _build_model_index()
+
+
 def dcid_model_lookup(name: Optional[str]) -> Optional[Tuple[str, Any]]:
     if not name:
         return None
-    for type_key, type_value in BASE_CONST.items():
-        for model_key, model_value in type_value['DCID_MODEL'].items():
-            if name == model_key:
-                return type_key, model_value
-    return None
+    return _MODEL_INDEX.get(name)
 
 
 def DCID_Parse(file: str) -> None:
-    tree = ET.parse(file)
-    root = tree.getroot()
+    # Streamed: the map Shure ships is tens of megabytes, and the whole tree
+    # used to be built just to read it once. Each top-level MapEntry is handled
+    # as it closes and then dropped from the root.
+    root = None
+    depth = 0
+    for event, device in ET.iterparse(file, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = device
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        if device.tag == 'MapEntry':
+            _parse_map_entry(device)
+        root.clear()
 
-    devices = root.findall('./MapEntry')
 
-    for device in devices:
-        key_element = device.find('Key')
-        model_element = device.find('ModelName')
-        dcid_list = device.find('DCIDList')
-        if key_element is None or model_element is None or dcid_list is None:
-            continue
+def _parse_map_entry(device: ET.Element) -> None:
+    key_element = device.find('Key')
+    model_element = device.find('ModelName')
+    dcid_list = device.find('DCIDList')
+    if key_element is None or model_element is None or dcid_list is None:
+        return
 
-        model = key_element.text or ''
-        model_name = model_element.text or ''
-        for dccid in dcid_list.iter('DCID'):
-            if dccid.text is None:
-                continue
-            band = dccid.attrib.get('band', '') if dccid.attrib else ''
-            dev = {'model': model, 'model_name': model_name, 'band': band}
-            deviceList[dccid.text] = dev
+    model = key_element.text or ''
+    model_name = model_element.text or ''
+    for dccid in dcid_list.iter('DCID'):
+        if dccid.text is None:
+            continue
+        band = dccid.attrib.get('band', '') if dccid.attrib else ''
+        dev = {'model': model, 'model_name': model_name, 'band': band}
+        deviceList[dccid.text] = dev
 
 
 def dcid_save_to_file(file: str) -> None:
@@ -656,7 +1056,16 @@ def dcid_save_to_file(file: str) -> None:
 def dcid_restore_from_file(file: str) -> None:
     global deviceList
     with open(file, 'r') as in_file:
-        deviceList = json.load(in_file)
+        deviceList = json.load(in_file, object_hook=_intern_dcid_entry)
+
+
+def _intern_dcid_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    # Hundreds of DCIDs share a handful of model names and bands; without this
+    # json.load makes a separate copy of each string for every entry.
+    return {
+        key: sys.intern(value) if isinstance(value, str) else value
+        for key, value in entry.items()
+    }
 
 
 def updateDCIDmap(inputFile: str, outputFile: str) -> None:
@@ -6,27 +6,33 @@ local caching of remote assets. It relies on the configuration helpers in
 """
 from __future__ import annotations
 
-import io
+import contextlib
+import functools
 import json
 import logging
 import os
+import stat
 import tempfile
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
+from urllib.parse import quote
 from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Tuple, cast
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union, cast
 
 import keyring  # type: ignore[import]
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from keyring import errors as keyring_errors  # type: ignore[import]
 
 from google.auth.exceptions import RefreshError  # type: ignore[import]
-from google.auth.transport.requests import Request  # type: ignore[import]
+from google.auth.transport.requests import AuthorizedSession, Request  # type: ignore[import]
 from google.oauth2.credentials import Credentials  # type: ignore[import]
 from google_auth_oauthlib.flow import Flow  # type: ignore[import]
 from googleapiclient.discovery import build  # type: ignore[import]
 from googleapiclient.errors import HttpError  # type: ignore[import]
-from googleapiclient.http import MediaIoBaseDownload  # type: ignore[import]
 
 import config as config_module
 
@@ -55,10 +61,39 @@ FILE_FIELDS = (
     'thumbnailLink,iconLink,webViewLink,webContentLink,md5Checksum,'
     'videoMediaMetadata,imageMediaMetadata'
 )
+# Enough to lay out a grid of files. list_media_files still defaults to
+# FILE_FIELDS, which is what /api/cloud/google-drive/files has always returned.
+LIST_FIELDS_MIN: Tuple[str, ...] = ('id', 'name', 'mimeType', 'size', 'modifiedTime', 'md5Checksum')
+DRIVE_FILES_URL = 'https://www.googleapis.com/drive/v3/files/'
+# (connect, read) seconds for media downloads. The read timeout is between
+# chunks, not for the whole file.
+DOWNLOAD_TIMEOUT = (10, 60)
+# How much of a download is read into memory per write. Background videos run
+# to hundreds of megabytes, and at 1 MiB that was hundreds of trips through the
+# read/write loop; 4 MiB cuts that by four while staying small enough for
+# several parallel downloads on a Raspberry Pi.
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
 
 _PENDING_FLOWS: Dict[str, Tuple[Flow, float]] = {}
 _FLOW_LOCK = threading.Lock()
 
+# Drive clients and download sessions, one of each per thread: the httplib2
+# connection under the client is not thread-safe, and requests makes no
+# promises for sessions. Each is held as ((generation, credential id, scopes),
+# client) and rebuilt when credentials are stored or cleared, which bumps the
+# generation.
+_SERVICE_CACHE = threading.local()
+_credentials_generation = 0
+
+# The stored credentials as last read from or written to the keyring:
+# (generation, credential id, Credentials). A keyring read can be a D-Bus or
+# Keychain round trip, and every new thread building its Drive client used to
+# make one. Reentrant because a refresh inside load_credentials stores the
+# result while still holding it, which also keeps two threads from refreshing
+# the same expired token at once.
+_credentials_memo: Optional[Tuple[int, str, Credentials]] = None
+_CREDENTIALS_LOCK = threading.RLock()
+
 
 class DriveConfigError(Exception):
     """Raised when provider configuration is missing or invalid."""
@@ -119,8 +154,9 @@ class DriveAuthMeta:
 
 
 def _provider_config() -> Dict[str, Any]:
-    config.ensure_cloud_defaults()
-    cloud_cfg = config.config_tree.get('cloud', {})
+    # ensure_cloud_defaults hands back the live section, and only re-checks it
+    # after something has replaced or changed it.
+    cloud_cfg = config.ensure_cloud_defaults()
     providers = cloud_cfg.get('providers', {})
     provider = providers.get('google_drive')
     if not isinstance(provider, dict):
@@ -128,8 +164,8 @@ def _provider_config() -> Dict[str, Any]:
     return provider
 
 
-def _get_auth_meta() -> DriveAuthMeta:
-    provider = _provider_config()
+def _get_auth_meta(provider: Optional[Dict[str, Any]] = None) -> DriveAuthMeta:
+    provider = provider if provider is not None else _provider_config()
     return DriveAuthMeta.from_config(provider.get('auth'))
 
 
@@ -138,12 +174,12 @@ def _persist_auth_meta(meta: DriveAuthMeta, *, persist: bool = True) -> DriveAut
     return meta
 
 
-def public_auth_state() -> Dict[str, Any]:
-    return _get_auth_meta().public_view()
+def public_auth_state(provider: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return _get_auth_meta(provider).public_view()
 
 
-def public_client_state() -> Dict[str, Any]:
-    provider = _provider_config()
+def public_client_state(provider: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    provider = provider if provider is not None else _provider_config()
     client_cfg = provider.get('client')
     client_summary: Dict[str, Any] = {'has_configuration': bool(client_cfg)}
     if isinstance(client_cfg, dict):
@@ -175,8 +211,8 @@ def public_provider_state() -> Dict[str, Any]:
     cache_cfg = cache_raw if isinstance(cache_raw, dict) else {}
     return {
         'enabled': bool(provider.get('enabled')),
-        'auth': public_auth_state(),
-        'client': public_client_state(),
+        'auth': public_auth_state(provider),
+        'client': public_client_state(provider),
         'cache': {
             'default': bool(cache_cfg.get('default')),
             'directory': cache_cfg.get('directory'),
@@ -209,6 +245,13 @@ def _deserialize_credentials(payload: str, *, scopes: Iterable[str]) -> Credenti
     return creds
 
 
+@functools.lru_cache(maxsize=16)
+def _canonical_scopes(scopes: Tuple[str, ...]) -> Tuple[str, ...]:
+    # Sorted and de-duplicated. The same one or two scopes come through on
+    # every refresh, so the result is remembered rather than rebuilt.
+    return tuple(sorted(frozenset(scopes)))
+
+
 def store_credentials(credentials: Credentials, *, meta: Optional[DriveAuthMeta] = None, persist: bool = True) -> DriveAuthMeta:
     meta = meta or _get_auth_meta()
     credential_id = _credential_key(meta)
@@ -218,34 +261,48 @@ def store_credentials(credentials: Credentials, *, meta: Optional[DriveAuthMeta]
     except keyring_errors.KeyringError as exc:
         raise DriveCredentialError('Unable to store Google Drive credentials in the system keyring.') from exc
 
-    scopes = tuple(sorted(set(credentials.scopes or meta.scopes))) or SCOPES
+    scopes = _canonical_scopes(tuple(credentials.scopes or meta.scopes)) or SCOPES
     meta.scopes = scopes
     meta.has_credentials = True
     meta.updated_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
     _persist_auth_meta(meta, persist=persist)
+    with _CREDENTIALS_LOCK:
+        _forget_services()
+        _remember_credentials(credential_id, credentials)
     LOGGER.info('Stored Google Drive credentials (id=%s)', credential_id)
     return meta
 
 
+def _remember_credentials(credential_id: str, credentials: Credentials) -> None:
+    global _credentials_memo
+    _credentials_memo = (_credentials_generation, credential_id, credentials)
+
+
 def load_credentials(*, auto_refresh: bool = True, persist: bool = True) -> Credentials:
     meta = _get_auth_meta()
     credential_id = _credential_key(meta)
-    try:
-        payload = keyring.get_password(SERVICE_NAME, credential_id)
-    except keyring_errors.KeyringError as exc:
-        raise DriveCredentialError('Unable to access the system keyring.') from exc
+    with _CREDENTIALS_LOCK:
+        memo = _credentials_memo
+        if memo is not None and memo[0] == _credentials_generation and memo[1] == credential_id:
+            credentials = memo[2]
+        else:
+            try:
+                payload = keyring.get_password(SERVICE_NAME, credential_id)
+            except keyring_errors.KeyringError as exc:
+                raise DriveCredentialError('Unable to access the system keyring.') from exc
 
-    if payload is None:
-        raise DriveCredentialError('Google Drive credentials have not been authorized yet.')
+            if payload is None:
+                raise DriveCredentialError('Google Drive credentials have not been authorized yet.')
 
-    credentials = _deserialize_credentials(payload, scopes=meta.scopes)
+            credentials = _deserialize_credentials(payload, scopes=meta.scopes)
+            _remember_credentials(credential_id, credentials)
 
-    if auto_refresh and credentials.expired and credentials.refresh_token:
-        try:
-            credentials.refresh(Request())
-            store_credentials(credentials, meta=meta, persist=persist)
-        except RefreshError as exc:
-            raise DriveCredentialError('Unable to refresh Google Drive credentials.') from exc
+        if auto_refresh and credentials.expired and credentials.refresh_token:
+            try:
+                credentials.refresh(Request())
+                store_credentials(credentials, meta=meta, persist=persist)
+            except RefreshError as exc:
+                raise DriveCredentialError('Unable to refresh Google Drive credentials.') from exc
 
     return credentials
 
@@ -263,16 +320,25 @@ def clear_credentials(*, persist: bool = True) -> DriveAuthMeta:
     meta.has_credentials = False
     meta.updated_at = None
     _persist_auth_meta(meta, persist=persist)
+    with _CREDENTIALS_LOCK:
+        # The new generation leaves the remembered credentials unmatched.
+        _forget_services()
     LOGGER.info('Cleared Google Drive credentials (id=%s)', credential_id)
     return meta
 
 
 def _cleanup_flows() -> None:
-    cutoff = time.time() - FLOW_EXPIRY_SECONDS
+    cutoff = time.monotonic() - FLOW_EXPIRY_SECONDS
     with _FLOW_LOCK:
-        stale_keys = [state for state, (_, created) in _PENDING_FLOWS.items() if created < cutoff]
+        # Flows are added in creation order and all live equally long, so the
+        # expired ones are always at the front: stop at the first live one.
+        stale_keys = []
+        for state, (_, created) in _PENDING_FLOWS.items():
+            if created >= cutoff:
+                break
+            stale_keys.append(state)
         for state in stale_keys:
-            _PENDING_FLOWS.pop(state, None)
+            del _PENDING_FLOWS[state]
 
 
 def _build_flow(redirect_uri: str) -> Flow:
@@ -282,7 +348,7 @@ def _build_flow(redirect_uri: str) -> Flow:
         raise DriveConfigError('Google Drive client configuration has not been provided yet.')
 
     try:
-        flow = Flow.from_client_config(client_cfg, scopes=list(_get_auth_meta().scopes or SCOPES))
+        flow = Flow.from_client_config(client_cfg, scopes=list(_get_auth_meta(provider).scopes or SCOPES))
     except Exception as exc:  # noqa: BLE001
         raise DriveConfigError('Invalid Google Drive OAuth client configuration.') from exc
 
@@ -303,7 +369,7 @@ def start_authorization_flow(redirect_uri: str, *, prompt: str = 'consent') -> D
         raise DriveConfigError('Unable to start Google Drive authorization flow.') from exc
 
     with _FLOW_LOCK:
-        _PENDING_FLOWS[state] = (flow, time.time())
+        _PENDING_FLOWS[state] = (flow, time.monotonic())
 
     flow_scopes = getattr(flow, 'scopes', None)
     scopes = list(flow_scopes) if flow_scopes else list(_get_auth_meta().scopes or SCOPES)
@@ -337,18 +403,79 @@ def complete_authorization_flow(state: str, code: str) -> DriveAuthMeta:
     return store_credentials(credentials)
 
 
+def _forget_services() -> None:
+    global _credentials_generation
+    _credentials_generation += 1
+
+
 def build_drive_service(credentials: Optional[Credentials] = None):
-    creds = credentials or load_credentials()
+    """A Drive v3 client for *credentials*, or for the stored credentials.
+
+    The client for stored credentials is kept and reused by the thread that
+    built it, so a request no longer reads the keyring and builds the API
+    surface from scratch. The client refreshes its own access token.
+    """
+    if credentials is not None:
+        return _build_service(credentials)
+    return _for_stored_credentials('service', _build_service)
+
+
+def _authorized_session() -> AuthorizedSession:
+    """A requests session that signs with the stored credentials.
+
+    Kept per thread like the Drive client, so downloads reuse its pooled
+    connection.
+    """
+    return _for_stored_credentials('session', _new_session)
+
+
+def _new_session(creds: Credentials) -> AuthorizedSession:
+    session = AuthorizedSession(creds)
+    # Drive answers bursts with 429 and the occasional 5xx; a short backoff
+    # and retry is what its documentation asks clients to do.
+    session.mount('https://', HTTPAdapter(max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+    )))
+    return session
+
+
+def _for_stored_credentials(name: str, factory):
+    meta = _get_auth_meta()
+    key = (_credentials_generation, meta.credential_id, meta.scopes)
+    cached = getattr(_SERVICE_CACHE, name, None)
+    # An expired token goes back through load_credentials rather than being
+    # left to the client: its own refresh would neither be stored in the
+    # keyring nor fail as a DriveCredentialError the UI can re-authorize on.
+    # google-auth counts a token expired a few minutes early, so this runs
+    # before the client would refresh it mid-request.
+    if cached is not None and cached[0] == key and not cached[2].expired:
+        return cached[1]
+
+    # Keyed by what was current before loading, so credentials stored in the
+    # meantime -- a refresh inside load_credentials included -- make the next
+    # call rebuild rather than going unnoticed.
+    creds = load_credentials()
+    client = factory(creds)
+    setattr(_SERVICE_CACHE, name, (key, client, creds))
+    return client
+
+
+def _build_service(creds: Credentials):
     try:
         return build('drive', 'v3', credentials=creds, cache_discovery=False)
     except HttpError as exc:  # pragma: no cover - network failure path
         raise DriveApiError('Unable to create Google Drive service client.') from exc
 
 
+_DEFAULT_MEDIA_QUERY = '({}) and trashed = false'.format(
+    ' or '.join(f"mimeType='{mime}'" for mime in MEDIA_MIME_TYPES))
+
+
 def _default_media_query() -> str:
-    mime_terms = [f"mimeType='{mime}'" for mime in MEDIA_MIME_TYPES]
-    mime_clause = ' or '.join(mime_terms)
-    return f'({mime_clause}) and trashed = false'
+    return _DEFAULT_MEDIA_QUERY
 
 
 def list_media_files(
@@ -358,18 +485,28 @@ def list_media_files(
     folder_id: Optional[str] = None,
     query: Optional[str] = None,
     order_by: str = 'modifiedTime desc',
+    fields: Union[str, Iterable[str], None] = None,
 ) -> Dict[str, Any]:
+    """One page of media files. *fields* narrows what Drive returns per file,
+    e.g. LIST_FIELDS_MIN or 'id,name'; a smaller response is less to transfer
+    and parse."""
     if page_size < 1:
         page_size = 1
     elif page_size > 1000:
         page_size = 1000
 
-    q_parts: List[str] = [_default_media_query()]
+    q_parts: List[str] = [_DEFAULT_MEDIA_QUERY]
     if folder_id:
         q_parts.append(f"'{folder_id}' in parents")
     if query:
         q_parts.append(f'({query})')
     effective_query = ' and '.join(q_parts)
+    if not fields:
+        file_fields = FILE_FIELDS
+    elif isinstance(fields, str):
+        file_fields = fields
+    else:
+        file_fields = ','.join(fields)
 
     service = build_drive_service()
     try:
@@ -378,13 +515,15 @@ def list_media_files(
             pageSize=page_size,
             pageToken=page_token,
             orderBy=order_by,
-            fields=f'files({FILE_FIELDS}),nextPageToken',
+            fields=f'files({file_fields}),nextPageToken',
             supportsAllDrives=True,
             includeItemsFromAllDrives=True,
             spaces='drive',
         ).execute()
     except HttpError as exc:
         raise DriveApiError('Google Drive API request failed while listing files.') from exc
+    except RefreshError as exc:
+        raise DriveCredentialError('Unable to refresh Google Drive credentials.') from exc
 
     files = response.get('files', []) if isinstance(response, dict) else []
     next_token = response.get('nextPageToken') if isinstance(response, dict) else None
@@ -409,12 +548,53 @@ def get_file_metadata(file_id: str, fields: Optional[str] = None) -> Dict[str, A
         ).execute()
     except HttpError as exc:
         raise DriveApiError('Failed to retrieve Google Drive file metadata.') from exc
+    except RefreshError as exc:
+        raise DriveCredentialError('Unable to refresh Google Drive credentials.') from exc
 
     if not isinstance(metadata, dict):
         raise DriveApiError('Google Drive returned an unexpected metadata payload.')
     return metadata
 
 
+# Drive's limit on calls per batch request.
+METADATA_BATCH_SIZE = 100
+
+
+def get_file_metadata_many(file_ids: Iterable[str], fields: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Metadata for several files, fetched in batch requests of up to 100.
+
+    Files Drive could not return are left out of the result, and logged.
+    """
+    unique_ids = list(dict.fromkeys(file_id for file_id in file_ids if file_id))
+    if not unique_ids:
+        return {}
+
+    service = build_drive_service()
+    field_list = fields or (FILE_FIELDS + ',sha1Checksum,etag')
+    found: Dict[str, Dict[str, Any]] = {}
+
+    def collect(request_id: str, response: Any, exception: Optional[Exception]) -> None:
+        if exception is not None:
+            LOGGER.debug('Google Drive metadata unavailable for %s: %s', request_id, exception)
+        elif isinstance(response, dict):
+            found[request_id] = response
+
+    for start in range(0, len(unique_ids), METADATA_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=collect)
+        for file_id in unique_ids[start:start + METADATA_BATCH_SIZE]:
+            batch.add(
+                service.files().get(fileId=file_id, fields=field_list, supportsAllDrives=True),
+                request_id=file_id,
+            )
+        try:
+            batch.execute()
+        except HttpError as exc:
+            raise DriveApiError('Failed to retrieve Google Drive file metadata.') from exc
+        except RefreshError as exc:
+            raise DriveCredentialError('Unable to refresh Google Drive credentials.') from exc
+    return found
+
+
 def _cache_settings() -> Dict[str, Any]:
     provider = _provider_config()
     cache_cfg = provider.get('cache')
@@ -426,14 +606,28 @@ def cache_enabled_by_default() -> bool:
     return bool(cache_cfg.get('default'))
 
 
+# (directory setting, config directory, resolved cache directory). Every
+# ensure_local_copy asks for the cache directory, and resolving and creating it
+# each time cost an expanduser, an abspath and a mkdir that fails with EEXIST.
+# Rebuilt whenever either input changes. A download re-creates the directory
+# itself, so one removed while running is only a cache miss.
+_cache_dir_memo: Optional[Tuple[Any, str, str]] = None
+
+
 def _cache_directory() -> str:
+    global _cache_dir_memo
     cache_cfg = _cache_settings()
     directory = cache_cfg.get('directory') if isinstance(cache_cfg, dict) else None
+    config_dir = config.config_path()
+    memo = _cache_dir_memo
+    if memo is not None and memo[0] == directory and memo[1] == config_dir:
+        return memo[2]
     if directory:
         base = os.path.abspath(os.path.expanduser(str(directory)))
     else:
-        base = os.path.join(config.config_path(), 'drive-cache')
+        base = os.path.join(config_dir, 'drive-cache')
     os.makedirs(base, exist_ok=True)
+    _cache_dir_memo = (directory, config_dir, base)
     return base
 
 
@@ -445,6 +639,17 @@ def _cache_max_age_hours() -> int:
         return 168
 
 
+_MIME_TO_EXTENSION: Dict[str, str] = {
+    'image/gif': '.gif',
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/webp': '.webp',
+    'video/mp4': '.mp4',
+    'video/webm': '.webm',
+    'video/quicktime': '.mov',
+}
+
+
 def _guess_extension(metadata: Dict[str, Any]) -> str:
     mime_type = metadata.get('mimeType') if isinstance(metadata, dict) else None
     name = metadata.get('name') if isinstance(metadata, dict) else None
@@ -452,21 +657,7 @@ def _guess_extension(metadata: Dict[str, Any]) -> str:
         _, ext = os.path.splitext(name)
         if ext:
             return ext.lower()
-    if mime_type == 'image/gif':
-        return '.gif'
-    if mime_type == 'image/png':
-        return '.png'
-    if mime_type == 'image/jpeg':
-        return '.jpg'
-    if mime_type == 'image/webp':
-        return '.webp'
-    if mime_type == 'video/mp4':
-        return '.mp4'
-    if mime_type == 'video/webm':
-        return '.webm'
-    if mime_type == 'video/quicktime':
-        return '.mov'
-    return '.bin'
+    return _MIME_TO_EXTENSION.get(mime_type, '.bin') if isinstance(mime_type, str) else '.bin'
 
 
 def _cache_metadata_path(data_path: str) -> str:
@@ -485,16 +676,48 @@ def _load_cached_metadata(data_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _write_cached_metadata(data_path: str, metadata: Dict[str, Any]) -> None:
-    meta_path = _cache_metadata_path(data_path)
-    temp_fd, temp_path = tempfile.mkstemp(prefix='drive-meta-', suffix='.json')
+@contextlib.contextmanager
+def _replacing(destination_path: str, *, prefix: str, suffix: str) -> Iterator[int]:
+    """A temp file descriptor whose contents replace *destination_path*.
+
+    The file is moved into place only if the block completes, and the
+    descriptor is closed either way. After a successful replace the temp name
+    is gone, so only a failure leaves anything to clean up -- and that is a
+    single unlink rather than an exists check first.
+
+    The temp file sits beside the destination, not in the system temp
+    directory: a cache on another mount (a container volume, an external
+    drive) would otherwise turn the replace into a copy of the whole file.
+    Its name starts with a dot so a crash leaves nothing that looks like
+    cached media.
+    """
+    temp_fd, temp_path = tempfile.mkstemp(
+        prefix='.' + prefix,
+        suffix=suffix,
+        dir=os.path.dirname(destination_path) or None,
+    )
     try:
-        with os.fdopen(temp_fd, 'w', encoding='utf-8') as handle:
-            json.dump(metadata, handle, indent=2, separators=(',', ': '))
-        os.replace(temp_path, meta_path)
-    finally:
-        if os.path.exists(temp_path):
+        try:
+            yield temp_fd
+        finally:
+            os.close(temp_fd)
+        os.replace(temp_path, destination_path)
+    except BaseException:
+        try:
             os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_cached_metadata(data_path: str, metadata: Dict[str, Any]) -> None:
+    meta_path = _cache_metadata_path(data_path)
+    # Compact: nobody edits these by hand, and indent makes json use its
+    # pure-Python encoder instead of the C one.
+    payload = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+    with _replacing(meta_path, prefix='drive-meta-', suffix='.json') as fd:
+        with open(fd, 'wb', closefd=False) as handle:
+            handle.write(payload)
 
 
 def _is_cache_valid(
@@ -504,39 +727,88 @@ def _is_cache_valid(
     fresh_meta: Optional[Dict[str, Any]],
     max_age_hours: int,
 ) -> bool:
-    if not os.path.isfile(data_path):
+    # One stat for both the is-it-a-file check and the age.
+    try:
+        info = os.stat(data_path)
+    except OSError:
+        return False
+    if not stat.S_ISREG(info.st_mode):
         return False
 
     if cached_meta and fresh_meta:
         cached_mod = cached_meta.get('modifiedTime')
         fresh_mod = fresh_meta.get('modifiedTime')
-        if cached_mod and fresh_mod and cached_mod != fresh_mod:
-            return False
+        if cached_mod and fresh_mod:
+            # Drive has just confirmed the copy is of the current revision,
+            # so however old it is, it is still right. max_age_hours is for
+            # when there is nothing to compare against.
+            return cached_mod == fresh_mod
 
     if max_age_hours > 0:
-        age_seconds = time.time() - os.path.getmtime(data_path)
+        age_seconds = time.time() - info.st_mtime
         if age_seconds > max_age_hours * 3600:
             return False
 
     return True
 
 
-def _download_drive_file(file_id: str, destination_path: str, *, chunk_size: int = 1_048_576) -> None:
-    service = build_drive_service()
-    request = service.files().get_media(fileId=file_id, supportsAllDrives=True)
-    temp_fd, temp_path = tempfile.mkstemp(prefix='drive-download-', suffix='.tmp')
+def _download_drive_file(file_id: str, destination_path: str, *, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> None:
+    # One streamed GET rather than MediaIoBaseDownload's ranged request per
+    # chunk; chunk_size is now only how much is read into memory at a time.
+    # Chunks that size pass straight through the file's write buffer, so
+    # writing them with os.write instead would save nothing.
+    session = _authorized_session()
+    url = DRIVE_FILES_URL + quote(file_id, safe='')
     try:
-        with os.fdopen(temp_fd, 'wb') as handle:
-            downloader = MediaIoBaseDownload(handle, request, chunksize=chunk_size)
-            done = False
-            while not done:
-                _status, done = downloader.next_chunk()
-        os.replace(temp_path, destination_path)
-    except HttpError as exc:
+        with _replacing(destination_path, prefix='drive-download-', suffix='.tmp') as fd:
+            with open(fd, 'wb', closefd=False) as handle:
+                with session.get(
+                    url,
+                    params={'alt': 'media', 'supportsAllDrives': 'true'},
+                    stream=True,
+                    timeout=DOWNLOAD_TIMEOUT,
+                ) as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        handle.write(chunk)
+    except requests.RequestException as exc:
         raise DriveApiError('Failed to download Google Drive file content.') from exc
-    finally:
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+    except RefreshError as exc:
+        raise DriveCredentialError('Unable to refresh Google Drive credentials.') from exc
+
+
+# How long a cached file counts as current after it was last checked against
+# Drive. Within this, a caller without metadata is served from the cache with
+# no Drive request at all; after it, the file is checked again. Much shorter
+# than max_age_hours, so a file replaced on Drive still shows up promptly.
+METADATA_RECHECK_SECONDS = 300
+
+# file id -> (monotonic deadline, cached path), for copies whose modifiedTime
+# matched metadata this process fetched from Drive itself. Only that renews
+# the window: a copy accepted on age alone, or on metadata a caller supplied,
+# says nothing about what Drive holds now. Held in memory, so a restart checks
+# every file once more.
+_verified_copies: Dict[str, Tuple[float, str]] = {}
+
+
+def _mark_verified(file_id: str, data_path: str) -> None:
+    _verified_copies[file_id] = (time.monotonic() + METADATA_RECHECK_SECONDS, data_path)
+
+
+def _recently_verified_copy(file_id: str) -> Optional[str]:
+    """A cached copy of *file_id* checked against Drive within the recheck window."""
+    verified = _verified_copies.get(file_id)
+    if verified is None:
+        return None
+    deadline, data_path = verified
+    if (
+        time.monotonic() < deadline
+        and os.path.dirname(data_path) == _cache_directory()
+        and _is_cache_valid(data_path, cached_meta=None, fresh_meta=None, max_age_hours=_cache_max_age_hours())
+    ):
+        return data_path
+    _verified_copies.pop(file_id, None)
+    return None
 
 
 def ensure_local_copy(
@@ -544,14 +816,35 @@ def ensure_local_copy(
     *,
     metadata: Optional[Dict[str, Any]] = None,
     use_cache: Optional[bool] = None,
-    chunk_size: int = 1_048_576,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
 ) -> str:
     if not file_id:
         raise DriveApiError('A Google Drive file ID must be provided.')
 
-    meta = metadata or get_file_metadata(file_id)
     do_cache = cache_enabled_by_default() if use_cache is None else bool(use_cache)
+    if do_cache and metadata is None:
+        recent = _recently_verified_copy(file_id)
+        if recent:
+            return recent
+
+    if metadata:
+        return _local_copy(file_id, metadata, from_drive=False, do_cache=do_cache, chunk_size=chunk_size)
+    return _local_copy(file_id, get_file_metadata(file_id), from_drive=True, do_cache=do_cache, chunk_size=chunk_size)
 
+
+def _local_copy(
+    file_id: str,
+    meta: Dict[str, Any],
+    *,
+    from_drive: bool,
+    do_cache: bool,
+    chunk_size: int,
+) -> str:
+    """ensure_local_copy once metadata is in hand.
+
+    *from_drive* says the metadata was fetched from Drive for this call, rather
+    than handed in by the caller, and so may mark the copy as verified.
+    """
     if not do_cache:
         temp_fd, temp_path = tempfile.mkstemp(prefix='drive-inline-', suffix=_guess_extension(meta))
         os.close(temp_fd)
@@ -563,26 +856,109 @@ def ensure_local_copy(
     target_path = os.path.join(cache_dir, f'{file_id}{extension}')
     cached_meta = _load_cached_metadata(target_path)
     max_age = _cache_max_age_hours()
+    fresh_mod = meta.get('modifiedTime') if from_drive else None
 
     if _is_cache_valid(target_path, cached_meta=cached_meta, fresh_meta=meta, max_age_hours=max_age):
+        if fresh_mod and cached_meta and cached_meta.get('modifiedTime') == fresh_mod:
+            _mark_verified(file_id, target_path)
         return target_path
 
+    os.makedirs(cache_dir, exist_ok=True)
     _download_drive_file(file_id, target_path, chunk_size=chunk_size)
     _write_cached_metadata(target_path, meta)
+    if fresh_mod:
+        # Just downloaded against what Drive reported, which the sidecar now
+        # records: the same match, made by construction.
+        _mark_verified(file_id, target_path)
     return target_path
 
 
+# Downloads ensure_local_copies runs at once, across all its callers.
+MAX_DOWNLOAD_WORKERS = 4
+
+_download_executor: Optional[ThreadPoolExecutor] = None
+_download_executor_lock = threading.Lock()
+
+
+def _get_download_executor() -> ThreadPoolExecutor:
+    """The pool Drive downloads run on, kept for the life of the process.
+
+    The Drive session is cached per thread, so a pool made for each call
+    built a new session and connection pool on every one of its threads, and
+    threw them away at the end. These threads stay, and keep theirs.
+    concurrent.futures joins them at interpreter exit and refuses new work
+    from then on with RuntimeError.
+    """
+    global _download_executor
+    with _download_executor_lock:
+        if _download_executor is None:
+            _download_executor = ThreadPoolExecutor(
+                max_workers=MAX_DOWNLOAD_WORKERS, thread_name_prefix='drive-download')
+        return _download_executor
+
+
+def ensure_local_copies(
+    file_ids: Iterable[str],
+    *,
+    use_cache: Optional[bool] = None,
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+) -> Dict[str, str]:
+    """Local paths for several Drive files, downloaded side by side.
+
+    Metadata comes from one batched request and up to MAX_DOWNLOAD_WORKERS
+    downloads run at once, so a gallery of files takes about as long as its
+    slowest file rather than the sum of them all. Files Drive could not
+    return are left out of the result; any other failure is raised once the
+    downloads in flight have finished.
+    """
+    unique_ids = list(dict.fromkeys(file_id for file_id in file_ids if file_id))
+    do_cache = cache_enabled_by_default() if use_cache is None else bool(use_cache)
+    paths: Dict[str, str] = {}
+    if do_cache:
+        for file_id in unique_ids:
+            recent = _recently_verified_copy(file_id)
+            if recent:
+                paths[file_id] = recent
+    pending = [file_id for file_id in unique_ids if file_id not in paths]
+    if not pending:
+        return paths
+
+    metadata = get_file_metadata_many(pending)
+    executor = _get_download_executor()
+    futures = {
+        file_id: executor.submit(
+            _local_copy,
+            file_id,
+            metadata[file_id],
+            from_drive=True,
+            do_cache=do_cache,
+            chunk_size=chunk_size,
+        )
+        for file_id in pending
+        if file_id in metadata
+    }
+    # Every download is waited for before any failure is raised, as when the
+    # pool was shut down at the end of each call.
+    wait(futures.values())
+    for file_id, future in futures.items():
+        paths[file_id] = future.result()
+    return paths
+
+
 __all__ = [
     'DriveApiError',
     'DriveConfigError',
     'DriveCredentialError',
     'DriveAuthMeta',
+    'LIST_FIELDS_MIN',
     'build_drive_service',
     'cache_enabled_by_default',
     'clear_credentials',
     'complete_authorization_flow',
     'ensure_local_copy',
+    'ensure_local_copies',
     'get_file_metadata',
+    'get_file_metadata_many',
     'list_media_files',
     'load_credentials',
     'public_auth_state',
@@ -1,8 +1,11 @@
+import functools
+import glob
 import json
 import logging
+import math
 import os
-from datetime import datetime, timezone
-from typing import Any, Dict, Iterable, List, Optional, Set
+import time
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 LOG_NAMESPACE = 'micboard'
 LOG_SOURCES = {
@@ -54,7 +57,7 @@ LEVEL_VALUES = {
     'CRITICAL': 50,
 }
 
-_RESERVABLE_ATTRS = {
+_RESERVABLE_ATTRS = frozenset({
     'name',
     'msg',
     'args',
@@ -76,7 +79,16 @@ _RESERVABLE_ATTRS = {
     'processName',
     'process',
     'message',
-}
+})
+# Python 3.12 sets taskName on every record: the asyncio task logging it, or
+# None outside one. A name is kept in the context; None alone is no context.
+_TASK_NAME_ONLY = frozenset({'taskName'})
+
+
+# json.dumps builds a new JSONEncoder on every call that passes any option,
+# ensure_ascii included; every log record written and every entry searched
+# would pay for that. One encoder, made once, goes straight to the C encoder.
+_encode_json = json.JSONEncoder(ensure_ascii=False).encode
 
 
 def default_settings() -> Dict[str, Any]:
@@ -116,6 +128,7 @@ def normalize_settings(raw: Any) -> Dict[str, Any]:
     return settings
 
 
+@functools.lru_cache(maxsize=256)
 def resolve_source(logger_name: str) -> str:
     if logger_name in LOG_SOURCES:
         return LOG_SOURCES[logger_name]
@@ -124,7 +137,21 @@ def resolve_source(logger_name: str) -> str:
     return logger_name
 
 
+# Level names as the formatter writes them, and as people type them into the
+# viewer, straight to their numbers. Filtering by level asks for the number of
+# every entry it reads; anything not spelled here takes the normalising path.
+_LEVEL_LOOKUP: Dict[str, int] = {
+    spelling: number
+    for name, number in LEVEL_VALUES.items()
+    for spelling in (name, name.lower(), name.title())
+}
+
+
 def level_to_number(level: Any) -> int:
+    if isinstance(level, str):
+        number = _LEVEL_LOOKUP.get(level)
+        if number is not None:
+            return number
     return LEVEL_VALUES.get(normalize_level(level, 'DEBUG'), LEVEL_VALUES['DEBUG'])
 
 
@@ -144,7 +171,15 @@ def _json_safe(value: Any) -> Any:
         return repr(value)
 
 
+_JSON_PRIMITIVES = frozenset({str, int, float, bool})
+
+
 def _collect_context(record: logging.LogRecord) -> Dict[str, Any]:
+    # Nearly every record carries nothing beyond the standard attributes; one
+    # set difference says so without walking them all.
+    extra = record.__dict__.keys() - _RESERVABLE_ATTRS
+    if not extra or (extra == _TASK_NAME_ONLY and record.taskName is None):
+        return {}
     context: Dict[str, Any] = {}
     existing = getattr(record, 'context', None)
     if isinstance(existing, dict):
@@ -155,13 +190,48 @@ def _collect_context(record: logging.LogRecord) -> Dict[str, Any]:
         if key == 'context':
             continue
         context.setdefault(key, value)
-    return {k: _json_safe(v) for k, v in context.items() if v is not None}
+    return {
+        k: v if type(v) in _JSON_PRIMITIVES else _json_safe(v)
+        for k, v in context.items()
+        if v is not None
+    }
+
+
+# (whole second, its ISO text): records come many to a second, and only the
+# microseconds differ between them.
+_ts_second: Tuple[Optional[int], str] = (None, '')
+
+
+def _format_timestamp(created: float) -> str:
+    """What datetime.fromtimestamp(created, tz=timezone.utc).isoformat() gives.
+
+    Without building a datetime and its tzinfo for every record: the seconds
+    are formatted once per second, and microseconds rounded the same way
+    datetime rounds them.
+    """
+    global _ts_second
+    fraction, whole = math.modf(created)
+    usec = round(fraction * 1e6)
+    second = int(whole)
+    if usec >= 1000000:
+        second += 1
+        usec -= 1000000
+    elif usec < 0:
+        second -= 1
+        usec += 1000000
+    cached = _ts_second
+    if cached[0] != second:
+        cached = (second, time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second)))
+        _ts_second = cached
+    if usec:
+        return f'{cached[1]}.{usec:06d}+00:00'
+    return cached[1] + '+00:00'
 
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         payload: Dict[str, Any] = {
-            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'ts': _format_timestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
             'source': resolve_source(record.name),
@@ -174,7 +244,7 @@ class JsonFormatter(logging.Formatter):
             payload['exc_info'] = self.formatException(record.exc_info)
         if record.stack_info:
             payload['stack'] = record.stack_info
-        return json.dumps(payload, ensure_ascii=False)
+        return _encode_json(payload)
 
 
 def build_logging_config(settings: Dict[str, Any], logfile_path: str) -> Dict[str, Any]:
@@ -242,41 +312,136 @@ def build_logging_config(settings: Dict[str, Any], logfile_path: str) -> Dict[st
     return config_dict
 
 
-def _entry_matches(
-    entry: Dict[str, Any],
+def _build_entry_predicate(
     level_threshold: Optional[int],
     allowed_sources: Optional[Set[str]],
     search_term: Optional[str],
-) -> bool:
-    source = entry.get('source')
-    if allowed_sources and (not isinstance(source, str) or source.lower() not in allowed_sources):
-        return False
+) -> Optional[Callable[[Dict[str, Any]], bool]]:
+    """One function testing an entry against every filter that is set.
+
+    Which filters apply is decided once per request, not re-checked for every
+    entry read. None means every entry matches.
+    """
+    checks: List[Callable[[Dict[str, Any]], bool]] = []
 
+    # Cheapest first: an integer compare, then a set lookup, then a text scan.
     if level_threshold is not None:
-        entry_level = level_to_number(entry.get('level'))
-        if entry_level < level_threshold:
-            return False
+        def level_matches(entry: Dict[str, Any]) -> bool:
+            return level_to_number(entry.get('level')) >= level_threshold
+
+        checks.append(level_matches)
+
+    if allowed_sources:
+        def source_matches(entry: Dict[str, Any]) -> bool:
+            source = entry.get('source')
+            return isinstance(source, str) and source.lower() in allowed_sources
+
+        checks.append(source_matches)
 
     if search_term:
-        haystacks: List[str] = []
-        message = entry.get('message')
-        if isinstance(message, str):
-            haystacks.append(message)
-        logger_name = entry.get('logger')
-        if isinstance(logger_name, str):
-            haystacks.append(logger_name)
-        context = entry.get('context')
-        if isinstance(context, dict):
+        def search_matches(entry: Dict[str, Any]) -> bool:
+            # Field by field, so the context is only serialised for entries
+            # whose message and logger name both miss.
+            message = entry.get('message')
+            if isinstance(message, str) and search_term in message.lower():
+                return True
+            logger_name = entry.get('logger')
+            if isinstance(logger_name, str) and search_term in logger_name.lower():
+                return True
+            context = entry.get('context')
+            if not context:
+                return False
             try:
-                haystacks.append(json.dumps(context, ensure_ascii=False))
+                text = _encode_json(context) if isinstance(context, dict) else str(context)
             except TypeError:
-                haystacks.append(str(context))
-        elif context is not None:
-            haystacks.append(str(context))
-        if search_term not in ' '.join(haystacks).lower():
-            return False
+                text = str(context)
+            return search_term in text.lower()
 
-    return True
+        checks.append(search_matches)
+
+    # Chained with `and` rather than all() over the list: no generator per
+    # entry, and the order above is kept.
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        first, second = checks
+        return lambda entry: first(entry) and second(entry)
+    first, second, third = checks
+    return lambda entry: first(entry) and second(entry) and third(entry)
+
+
+# How much of the log is read at a time when paging backwards from the end.
+_READ_BLOCK = 64 * 1024
+
+
+def _lines_before(handle: BinaryIO, end: int) -> Iterator[Tuple[int, bytes]]:
+    """(offset, line) for each line starting before byte *end*, last first.
+
+    Reads the file backwards a block at a time, so a page of recent entries
+    costs a few blocks from the tail however large the log has grown.
+    """
+    pos = end
+    # Pieces of the line that runs into the blocks already read, last first.
+    # Kept as a list so a line longer than a block -- a long traceback -- is
+    # joined once, not re-copied onto every block read before it.
+    carry: List[bytes] = []
+    while pos > 0:
+        start = max(0, pos - _READ_BLOCK)
+        handle.seek(start)
+        chunk = handle.read(pos - start)
+        pos = start
+        if start > 0 and b'\n' not in chunk:
+            carry.append(chunk)
+            continue
+        carry.append(chunk)
+        block = b''.join(reversed(carry))
+        lines = block.split(b'\n')
+        line_end = start + len(block)
+        # The first piece may be the tail of a line that began in an earlier
+        # block; it is carried over unless this block starts the file.
+        for line in reversed(lines[1:]):
+            line_start = line_end - len(line)
+            yield line_start, line
+            line_end = line_start - 1
+        carry = [lines[0]]
+    if carry and carry != [b'']:
+        yield 0, b''.join(reversed(carry))
+
+
+def _lines_after(handle: BinaryIO, cursor: int) -> Iterator[Tuple[int, bytes]]:
+    """(offset, line) for each line starting after byte *cursor*, in order."""
+    if cursor >= 0:
+        handle.seek(cursor)
+        # The rest of the line at the cursor, which the caller has already seen.
+        handle.readline()
+    offset = handle.tell()
+    for line in handle:
+        yield offset, line
+        offset += len(line)
+
+
+def _parse_entry(raw: bytes) -> Optional[Dict[str, Any]]:
+    # No strip: json.loads skips the newline, and the carriage return on
+    # Windows, itself. Blank lines other than a bare newline just fail to parse.
+    if not raw or raw == b'\n':
+        return None
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        # Includes UnicodeDecodeError, for a line cut off mid-character.
+        return None
+    if not isinstance(entry, dict):
+        return None
+
+    entry.setdefault('source', resolve_source(entry.get('logger', '')))
+    context = entry.get('context')
+    if context is None:
+        entry['context'] = {}
+    elif not isinstance(context, dict):
+        entry['context'] = {'value': context}
+    return entry
 
 
 def read_log_entries(
@@ -289,106 +454,61 @@ def read_log_entries(
     search: Optional[str] = None,
     newer: bool = False,
 ) -> Dict[str, Any]:
+    """A page of matching entries from the log, newest first unless *newer*.
+
+    Cursors and indexes are the byte offset at which an entry's line starts.
+    Reading from an offset lets a page be served by seeking to it, where a line
+    number meant reading and splitting the whole file -- up to 60 MB with the
+    default rotation settings -- on every poll of the log viewer. Offsets order
+    entries exactly as line numbers did.
+
+    The file is read with seek and read rather than mapped: a mapping of a log
+    that is truncated underneath it (a purge, or logrotate's copytruncate)
+    faults the whole process with SIGBUS instead of raising.
+    """
+    empty = {'entries': [], 'next_cursor': None, 'has_more': False}
     try:
-        with open(logfile_path, 'r', encoding='utf-8') as handle:
-            lines = handle.readlines()
+        handle = open(logfile_path, 'rb')
     except FileNotFoundError:
-        return {'entries': [], 'next_cursor': None, 'has_more': False}
+        return empty
 
-    total = len(lines)
-    if total == 0:
-        return {'entries': [], 'next_cursor': None, 'has_more': False}
+    with handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return empty
 
-    limit = max(1, int(limit))
-    cursor_default = -1 if newer else total
-    try:
-        cursor_idx = int(cursor) if cursor is not None else cursor_default
-    except (TypeError, ValueError):
-        cursor_idx = cursor_default
-    cursor_idx = min(total, cursor_idx)
-
-    allowed_sources = {s.lower() for s in sources} if sources else None
-    search_term = search.lower() if search else None
-    level_threshold = level_to_number(level) if level else None
-
-    entries: List[Dict[str, Any]] = []
-    has_more = False
-
-    if newer:
-        start = max(-1, cursor_idx)
-        for idx in range(start + 1, total):
-            raw = lines[idx].strip()
-            if not raw:
-                continue
-            try:
-                entry = json.loads(raw)
-            except json.JSONDecodeError:
+        limit = max(1, int(limit))
+        cursor_default = -1 if newer else size
+        try:
+            cursor_pos = int(cursor) if cursor is not None else cursor_default
+        except (TypeError, ValueError):
+            cursor_pos = cursor_default
+        cursor_pos = min(size, cursor_pos)
+
+        allowed_sources = {s.lower() for s in sources} if sources else None
+        search_term = search.lower() if search else None
+        level_threshold = level_to_number(level) if level else None
+        matches = _build_entry_predicate(level_threshold, allowed_sources, search_term)
+
+        if newer:
+            candidates = _lines_after(handle, cursor_pos)
+        else:
+            candidates = _lines_before(handle, max(0, cursor_pos))
+
+        entries: List[Dict[str, Any]] = []
+        has_more = False
+        for offset, raw in candidates:
+            entry = _parse_entry(raw)
+            if entry is None:
                 continue
-
-            entry.setdefault('source', resolve_source(entry.get('logger', '')))
-            context = entry.get('context')
-            if context is None:
-                entry['context'] = {}
-            elif not isinstance(context, dict):
-                entry['context'] = {'value': context}
-
-            if not _entry_matches(entry, level_threshold, allowed_sources, search_term):
+            if matches is not None and not matches(entry):
                 continue
-
-            entry['cursor'] = str(idx)
-            entry['index'] = idx
-            entries.append(entry)
-
             if len(entries) >= limit:
-                for remaining in range(idx + 1, total):
-                    candidate_raw = lines[remaining].strip()
-                    if not candidate_raw:
-                        continue
-                    try:
-                        candidate = json.loads(candidate_raw)
-                    except json.JSONDecodeError:
-                        continue
-                    candidate.setdefault('source', resolve_source(candidate.get('logger', '')))
-                    context_candidate = candidate.get('context')
-                    if context_candidate is None:
-                        candidate['context'] = {}
-                    elif not isinstance(context_candidate, dict):
-                        candidate['context'] = {'value': context_candidate}
-                    if _entry_matches(candidate, level_threshold, allowed_sources, search_term):
-                        has_more = True
-                        break
+                has_more = True
                 break
-    else:
-        for idx in range(total - 1, -1, -1):
-            if idx >= cursor_idx:
-                continue
-            raw = lines[idx].strip()
-            if not raw:
-                continue
-            try:
-                entry = json.loads(raw)
-            except json.JSONDecodeError:
-                continue
-
-            entry.setdefault('source', resolve_source(entry.get('logger', '')))
-            context = entry.get('context')
-            if context is None:
-                entry['context'] = {}
-            elif not isinstance(context, dict):
-                entry['context'] = {'value': context}
-
-            if not _entry_matches(entry, level_threshold, allowed_sources, search_term):
-                continue
-
-            entry['cursor'] = str(idx)
-            entry['index'] = idx
-
-            if len(entries) < limit:
-                entries.append(entry)
-                continue
-
-            has_more = True
-            break
+            entry['cursor'] = str(offset)
+            entry['index'] = offset
+            entries.append(entry)
 
     return {
         'entries': entries,
@@ -397,16 +517,24 @@ def read_log_entries(
     }
 
 
-def purge_logs(logfile_path: str, backups: int = 5) -> None:
-    with open(logfile_path, 'w', encoding='utf-8') as handle:
-        handle.truncate(0)
+def purge_logs(logfile_path: str) -> None:
+    """Empty the log and delete every numbered backup of it.
+
+    All of them, not just as many as the current backup count: copies left
+    from a larger count used to survive a purge.
+    """
+    try:
+        os.truncate(logfile_path, 0)
+    except FileNotFoundError:
+        open(logfile_path, 'wb').close()
 
-    for idx in range(1, backups + 1):
-        backup_path = f"{logfile_path}.{idx}"
+    for backup_path in glob.glob(glob.escape(logfile_path) + '.*'):
+        if not backup_path[len(logfile_path) + 1:].isdigit():
+            continue
         try:
             os.remove(backup_path)
         except FileNotFoundError:
-            continue
+            pass
 
 
 def available_sources() -> List[str]:
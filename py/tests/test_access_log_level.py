@@ -17,6 +17,7 @@ import sys
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import config  # noqa: E402
 import logging_utils  # noqa: E402
 
 
@@ -70,3 +71,18 @@ def test_rotation_stays_bounded():
     assert handler['class'] == 'logging.handlers.RotatingFileHandler'
     assert handler['maxBytes'] == 10 * 1024 * 1024
     assert handler['backupCount'] == 5
+
+
+def test_unchanged_settings_are_not_applied_again(monkeypatch):
+    applied = []
+    monkeypatch.setattr(config, '_applied_logging', None)
+    monkeypatch.setattr(config, 'log_file', lambda: '/tmp/application.log')
+    monkeypatch.setattr(config.logging.config, 'dictConfig', applied.append)
+
+    config.configure_logging({'level': 'info'})
+    config.configure_logging({'level': 'INFO'})
+    assert len(applied) == 1
+
+    config.configure_logging({'level': 'DEBUG'})
+    config.configure_logging({'level': 'DEBUG', 'levels': {'pco': 'debug'}})
+    assert len(applied) == 3
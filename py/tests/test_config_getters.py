@@ -0,0 +1,111 @@
+"""What the config getters hand back to the web handlers.
+
+Every getter returns a copy, because the handlers serialise and sometimes
+adjust what they are given, and the tree behind it is the one that gets saved.
+A getter that leaked a live reference would let a response quietly rewrite
+config.json on the next save.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+
+@pytest.fixture
+def tree(monkeypatch):
+    tree = {'slots': [], 'groups': []}
+    monkeypatch.setattr(config, 'config_tree', tree)
+    return tree
+
+
+def test_cloud_settings_are_a_copy(tree):
+    settings = config.get_cloud_settings()
+    settings['providers']['google_drive']['auth']['scopes'].append('mutated')
+
+    stored = tree['cloud']['providers']['google_drive']['auth']['scopes']
+    assert 'mutated' not in stored
+
+
+def test_discovery_settings_are_a_copy(tree):
+    settings = config.get_discovery_settings()
+    settings['subnets'].append('10.0.0.0/24')
+
+    assert tree['discovery']['subnets'] == []
+
+
+def test_slot_media_sources_are_stored_as_a_copy(tree):
+    payload = {'1': {'file_id': 'abc'}}
+    config.update_slot_media_sources(payload, persist=False)
+    payload['1']['file_id'] = 'changed'
+
+    assert config.get_slot_media_sources() == {'1': {'file_id': 'abc'}}
+
+
+class TestLookupByNumber:
+    def test_a_replaced_slot_list_is_looked_up_afresh(self, tree):
+        tree['slots'] = [{'slot': 1, 'type': 'ulxd'}]
+        assert config.get_slot_by_number(1)['type'] == 'ulxd'
+
+        tree['slots'] = [{'slot': 1, 'type': 'qlxd'}]
+
+        assert config.get_slot_by_number(1)['type'] == 'qlxd'
+
+    def test_a_group_added_since_the_last_lookup_is_found(self, tree):
+        tree['groups'].append({'group': 1, 'slots': [1]})
+        assert config.get_group_by_number(2) is None
+
+        tree['groups'].append({'group': 2, 'slots': [2]})
+
+        assert config.get_group_by_number('2')['slots'] == [2]
+
+    def test_the_first_of_duplicate_numbers_wins(self, tree):
+        tree['slots'] = [{'slot': 3, 'name': 'first'}, {'slot': 3, 'name': 'second'}]
+
+        assert config.get_slot_by_number(3)['name'] == 'first'
+
+    def test_clearing_device_names_finds_slots_by_number(self, tree, monkeypatch):
+        monkeypatch.setattr(config, 'save_current_config', lambda: None)
+        tree['slots'] = [
+            {'slot': 1, 'chan_name_raw': 'A'},
+            {'slot': 2, 'chan_name_raw': 'B', 'extended_name': 'Jane'},
+        ]
+
+        assert config.clear_device_names(['2', 9]) == [2]
+        assert tree['slots'] == [{'slot': 1, 'chan_name_raw': 'A'}, {'slot': 2, 'extended_name': 'Jane'}]
+
+    def test_a_single_slot_given_as_a_string_is_one_number(self, tree, monkeypatch):
+        monkeypatch.setattr(config, 'save_current_config', lambda: None)
+        tree['slots'] = [{'slot': n, 'chan_name_raw': 'X'} for n in (1, 2, 12)]
+
+        assert config.clear_device_names('12') == [12]
+
+
+class TestDefaultsPass:
+    def test_auth_metadata_missing_fields_is_filled_in_again(self, tree):
+        config.ensure_cloud_defaults()
+
+        config.update_google_drive_auth_metadata({'credential_id': 'x'}, persist=False)
+
+        auth = config.get_google_drive_settings()['auth']
+        assert auth['scopes'] == [config.GOOGLE_DRIVE_SCOPE_READONLY]
+        assert auth['has_credentials'] is False
+
+    def test_a_section_replaced_from_disk_is_normalised(self, tree):
+        config.ensure_discovery_defaults()
+
+        tree['discovery'] = {'scan_interval': 1}
+
+        assert config.get_discovery_settings()['scan_interval'] == config.DISCOVERY_MIN_INTERVAL
+
+    def test_nothing_marks_the_saved_tree(self, tree):
+        config.ensure_cloud_defaults()
+        config.ensure_discovery_defaults()
+        config.ensure_logging_defaults()
+
+        assert sorted(tree) == ['cloud', 'discovery', 'groups', 'logging', 'slots']
+        assert set(tree['cloud']) == {'providers', 'slot_sources'}
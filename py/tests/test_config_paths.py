@@ -77,3 +77,49 @@ def test_missing_democonfig_does_not_raise(bundle, monkeypatch):
 
     # Previously this called copyfile() on a path that does not exist.
     assert config.config_file() == str(user_dir / 'config.json')
+
+
+def test_the_resolved_file_is_reused_rather_than_stat_again(bundle, monkeypatch):
+    """Every save resolves config_file(), so it must not re-stat each time."""
+    bundle_dir, user_dir = bundle
+    (user_dir / 'config.json').write_text('{"from": "user"}', encoding='utf-8')
+    monkeypatch.setattr(sys, 'frozen', True, raising=False)
+
+    first = config.config_file()
+    monkeypatch.setattr(os.path, 'exists', lambda path: pytest.fail('stat on ' + path))
+
+    assert config.config_file() == first
+
+
+def test_a_missing_file_with_nothing_to_seed_is_looked_for_again(bundle, monkeypatch):
+    bundle_dir, user_dir = bundle
+    (bundle_dir / 'democonfig.json').unlink()
+    monkeypatch.setattr(sys, 'frozen', True, raising=False)
+
+    config.config_file()
+    (bundle_dir / 'democonfig.json').write_text('{"demo": true}', encoding='utf-8')
+    config.config_file()
+
+    assert (user_dir / 'config.json').exists()
+
+
+def test_the_version_follows_the_bundle_it_is_read_from(bundle, monkeypatch):
+    bundle_dir, _ = bundle
+    (bundle_dir / 'package.json').write_text('{"version": "9.9.9"}', encoding='utf-8')
+    monkeypatch.setattr(config, '_version_cache', None)
+
+    assert config.get_version_number() == '9.9.9'
+
+    monkeypatch.setattr(config, 'app_dir', lambda folder=None: str(bundle_dir / 'elsewhere.json'))
+
+    assert config.get_version_number() == 'unknown'
+
+
+def test_choosing_a_background_folder_reports_it_as_existing(bundle, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'config_tree', {'slots': [], 'background-folder': str(tmp_path / 'media')})
+    monkeypatch.setattr(config, 'save_current_config', lambda: None)
+    assert config.get_background_directory_state()['exists'] is False
+
+    state = config.set_background_directory(str(tmp_path / 'media'))
+
+    assert state['exists'] is True
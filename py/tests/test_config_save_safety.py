@@ -181,3 +181,110 @@ def test_a_save_that_fails_to_reload_keeps_the_running_config(config_file, monke
 
     assert config.config_tree.get('slots')
     assert config.config_tree.get('port') == 8058
+
+
+def test_a_save_that_changes_nothing_leaves_the_file_alone(config_file):
+    """Every update_* saves the whole tree, so most saves change nothing.
+
+    Rewriting (and fsyncing) identical bytes costs a full write per save and
+    buys nothing; the file is already what it would become.
+    """
+    tree = {'slots': [], 'port': 8058}
+    config.write_json_config(tree)
+    before = os.stat(str(config_file))
+
+    config.write_json_config(tree)
+
+    after = os.stat(str(config_file))
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+def test_a_hand_edit_since_the_last_save_is_still_overwritten(config_file):
+    """The file is documented as hand-editable, so it is not only ours.
+
+    An edit made after our last write must not be taken for our own bytes: the
+    next save has to replace it, exactly as it did before saves were skipped.
+    """
+    tree = {'slots': [], 'port': 8058}
+    config.write_json_config(tree)
+    config_file.write_text('{"slots": [], "port": 9000}')
+
+    config.write_json_config(tree)
+
+    assert json.loads(config_file.read_text())['port'] == 8058
+
+
+def test_an_unchanged_save_does_not_render_the_indented_file(config_file, monkeypatch):
+    """The indented rendering runs on the pure-Python encoder; skip it when unchanged."""
+    tree = {'slots': [], 'port': 8058}
+    config.write_json_config(tree)
+
+    real_dumps = json.dumps
+
+    def dumps(obj, **kwargs):
+        assert 'indent' not in kwargs, 'rendered config.json for an unchanged tree'
+        return real_dumps(obj, **kwargs)
+
+    monkeypatch.setattr(config.json, 'dumps', dumps)
+    config.write_json_config({'port': 8058, 'slots': []})
+
+
+def test_a_transaction_writes_once_for_many_updates(config_file, monkeypatch):
+    writes = []
+    monkeypatch.setattr(config, 'write_json_config', lambda data: writes.append(data))
+    config.config_tree['slots'] = [{'slot': n, 'type': 'offline'} for n in (1, 2, 3)]
+
+    with config.config_transaction():
+        for n in (1, 2, 3):
+            config.update_slot({'slot': n, 'extended_name': 'Name {}'.format(n)})
+        assert writes == []
+
+    assert len(writes) == 1
+
+
+def test_a_failing_transaction_still_persists_what_was_applied(config_file, monkeypatch):
+    """Each update used to save on its own, so a later failure lost nothing."""
+    writes = []
+    monkeypatch.setattr(config, 'write_json_config', lambda data: writes.append(data))
+
+    with pytest.raises(RuntimeError):
+        with config.config_transaction():
+            config.update_slot({'slot': 1, 'extended_name': 'Alice'})
+            raise RuntimeError('next update failed')
+
+    assert len(writes) == 1
+
+
+class TestRenameWithoutRebuild:
+    """A save that leaves every device as it was should not reconnect them.
+
+    The rebuild waits two seconds for the old sockets and then dials every
+    receiver again -- during a service, for what is usually a name change.
+    """
+
+    @pytest.fixture
+    def running(self, config_file, monkeypatch):
+        import offline
+
+        monkeypatch.setattr(offline, 'OfflineDevices', [])
+        monkeypatch.setattr(config, 'config_load_degraded', False, raising=False)
+        offline.add_device(config.config_tree['slots'][0])
+        rebuilds = []
+        monkeypatch.setattr(config, 'rebuild_from_disk', lambda: rebuilds.append(True))
+        return offline.OfflineDevices, rebuilds
+
+    def test_a_rename_keeps_the_devices_and_shows_the_new_name(self, running):
+        devices, rebuilds = running
+
+        config.reconfig({'slots': [{'slot': 1, 'type': 'offline', 'ip': '10.0.0.1', 'extended_name': 'Jane'}]})
+
+        assert rebuilds == []
+        assert devices[0].cfg is config.config_tree['slots'][0]
+        assert devices[0].get_chan_name() == ('', 'Jane')
+
+    def test_a_new_address_still_rebuilds(self, running):
+        devices, rebuilds = running
+
+        config.reconfig({'slots': [{'slot': 1, 'type': 'offline', 'ip': '10.0.0.2'}]})
+
+        assert rebuilds == [True]
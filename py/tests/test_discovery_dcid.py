@@ -0,0 +1,111 @@
+"""Finding a DCID in a probe reply, and the receiver type for its model.
+
+Replies are matched with one regex when every key in the map is a UUID, which
+is all Shure ships. It has to agree with the token loop it replaced: whole
+tokens only, the same punctuation stripped, an optional "cd:" prefix, any
+case.
+
+Model names are looked up in a flat index built from BASE_CONST, which must
+give the same answer as walking the table in order.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discover  # noqa: E402
+
+DCID = '03EC1770-FD5A-11E3-9967-0015C5F3F612'
+
+
+def _token_loop(data):
+    for token in data.split():
+        candidate = token.strip(' <>"\r\n\t;,').upper()
+        if candidate.startswith('CD:'):
+            candidate = candidate[3:]
+        if candidate in discover.deviceList:
+            return candidate
+    return None
+
+
+@pytest.fixture(autouse=True)
+def device_map(monkeypatch):
+    monkeypatch.setattr(discover, 'deviceList', {DCID: {'model': 'ULXD4'}}, raising=False)
+    yield
+
+
+@pytest.mark.parametrize('reply', [
+    f'< REP 1 DEVICE_ID {DCID} >',
+    f'< REP 1 DEVICE_ID {{{DCID}}} >',
+    f'cd:{DCID.lower()},',
+    f'"<{DCID}>";',
+    f'x{DCID}',
+    f'{DCID}-',
+    f'CD:{DCID}',
+    f'a\t{DCID}\r\n',
+    'nothing here',
+])
+def test_matches_the_token_loop(reply):
+    assert discover._extract_dcid_from_text(reply) == _token_loop(reply)
+
+
+def test_a_map_that_is_not_all_uuids_still_matches(monkeypatch):
+    monkeypatch.setattr(discover, 'deviceList', {'ABC123': {'model': 'ULXD4'}})
+
+    assert discover._extract_dcid_from_text('< REP 1 DEVICE_ID abc123 >') == 'ABC123'
+
+
+def test_model_lookup_matches_a_walk_of_base_const():
+    for type_key, type_value in discover.BASE_CONST.items():
+        for model_key, model_value in type_value['DCID_MODEL'].items():
+            found_type, found_value = discover.dcid_model_lookup(model_key)
+            first = next(t for t, v in discover.BASE_CONST.items() if model_key in v['DCID_MODEL'])
+            assert found_type == first
+            assert found_value == discover.BASE_CONST[first]['DCID_MODEL'][model_key]
+    assert discover.dcid_model_lookup('ADTx') is None
+    assert discover.dcid_model_lookup(None) is None
+
+
+def test_streamed_map_reads_only_top_level_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(discover, 'deviceList', {})
+    source = tmp_path / 'DCIDMap.xml'
+    source.write_text(
+        '<?xml version="1.0"?>\n<DCIDMap>'
+        '<MapEntry><Key>ULXD4</Key><ModelName>ULXD4 Receiver</ModelName>'
+        '<DCIDList><DCID band="G50">AAA</DCID><DCID>BBB</DCID><DCID/></DCIDList></MapEntry>'
+        '<Other><MapEntry><Key>X</Key><ModelName>X</ModelName>'
+        '<DCIDList><DCID>NESTED</DCID></DCIDList></MapEntry></Other>'
+        '<MapEntry><Key>QLXD4</Key><ModelName>QLXD4</ModelName></MapEntry>'
+        '</DCIDMap>\n')
+
+    discover.DCID_Parse(str(source))
+
+    assert discover.deviceList == {
+        'AAA': {'model': 'ULXD4', 'model_name': 'ULXD4 Receiver', 'band': 'G50'},
+        'BBB': {'model': 'ULXD4', 'model_name': 'ULXD4 Receiver', 'band': ''},
+    }
+
+
+@pytest.mark.parametrize('announcement', [
+    f'service:sennheiser-shure,(x-attr=1),(cd:{DCID})',
+    f'(cd:AAA),(cd:{DCID}),(other)',
+    f'cd:{DCID}',
+    'no marker at all',
+    '',
+])
+def test_announcement_dcid_is_the_same_from_bytes(announcement):
+    expected = ''
+    for segment in announcement.split(','):
+        segment = segment.strip('()')
+        if 'cd:' in segment:
+            expected = segment.split('cd:')[-1]
+
+    assert discover.dcid_find(announcement) == expected
+    assert discover.dcid_find(announcement.encode()) == expected
+
+
+def test_undecodable_bytes_in_an_announcement_are_dropped():
+    assert discover.dcid_find(b'\xff(cd:' + DCID.encode() + b'\xfe)') == DCID
@@ -10,7 +10,11 @@ routes let a non-device into the list:
 """
 
 import os
+import ipaddress
+import socket
 import sys
+import threading
+import time
 
 import pytest
 
@@ -111,53 +115,185 @@ class TestMulticastAnnouncements:
         assert captured == []
 
 
-class TestActiveProbe:
-    """_probe_ip against a fake socket, so no network is involved."""
+class ScriptedConn:
+    """A connected socket whose recv works through *replies*: bytes to return,
+    or an exception to raise. Records what was sent and whether it closed."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.sent = []
+        self.closed = False
+
+    def __enter__(self): return self
+    def __exit__(self, *a): self.closed = True
+    def settimeout(self, _): pass
+    def sendall(self, data): self.sent.append(data)
+
+    def recv(self, _):
+        if not self.replies:
+            raise BlockingIOError()
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
 
-    def _fake_socket(self, monkeypatch, response: bytes):
-        class FakeConn:
-            def __enter__(self): return self
-            def __exit__(self, *a): return False
-            def settimeout(self, _): pass
-            def sendall(self, _): pass
-            def recv(self, _): return response
+def probe(conn, ip='10.0.0.9'):
+    return discover._probe_connected(conn, ip, time.monotonic(), 0.5)
 
-        monkeypatch.setattr(discover.socket, 'create_connection',
-                            lambda addr, timeout=None: FakeConn())
+
+class TestActiveProbe:
+    """_probe_connected against a fake connection, so no network is involved."""
 
     def test_a_receiver_is_reported(self, monkeypatch):
-        self._fake_socket(monkeypatch, SHURE_REPLY.encode())
         monkeypatch.setattr(discover, '_parse_probe_payload',
                             lambda payload: {'type': 'ulxd', 'channels': 4, 'model': 'ULXD4Q'})
+        conn = ScriptedConn([SHURE_REPLY.encode()])
 
-        result = discover._probe_ip('10.0.0.9', 0.5)
+        result = probe(conn)
 
         assert result is not None
         assert result['ip'] == '10.0.0.9'
         assert result['type'] == 'ulxd'
         assert result['source'] == 'active'
+        assert conn.closed
 
-    def test_a_silent_open_port_is_not_a_device(self, monkeypatch):
+    def test_a_silent_open_port_is_not_a_device(self):
         """The reported bug: anything listening on 2202 became a receiver."""
-        self._fake_socket(monkeypatch, b'')
-
-        assert discover._probe_ip('10.0.0.10', 0.5) is None
+        conn = ScriptedConn([b'', b''])
 
-    def test_another_service_on_2202_is_not_a_device(self, monkeypatch):
-        self._fake_socket(monkeypatch, b'SSH-2.0-OpenSSH_9.6\r\n')
+        assert probe(conn) is None
+        assert conn.closed
 
-        assert discover._probe_ip('10.0.0.11', 0.5) is None
+    def test_another_service_on_2202_is_not_a_device(self):
+        assert probe(ScriptedConn([b'SSH-2.0-OpenSSH_9.6\r\n'])) is None
 
     def test_shure_gear_that_is_not_a_receiver_is_not_reported(self, monkeypatch):
-        self._fake_socket(monkeypatch, SHURE_REPLY.encode())
         monkeypatch.setattr(discover, '_parse_probe_payload',
                             lambda payload: {'model': 'ADTx', 'dcid': 'TX-DCID'})
 
-        assert discover._probe_ip('10.0.0.12', 0.5) is None
+        assert probe(ScriptedConn([SHURE_REPLY.encode()])) is None
 
-    def test_an_unreachable_host_is_not_a_device(self, monkeypatch):
-        def refuse(addr, timeout=None):
-            raise ConnectionRefusedError()
-        monkeypatch.setattr(discover.socket, 'create_connection', refuse)
-
-        assert discover._probe_ip('10.0.0.13', 0.5) is None
+    def test_device_id_queries_go_in_one_write_and_a_split_reply_is_reassembled(self, monkeypatch):
+        seen = []
+        monkeypatch.setattr(discover, '_parse_probe_payload',
+                            lambda payload: seen.append(payload) or {'type': 'ulxd'})
+        conn = ScriptedConn([b'< REP 1 DEV', b'ICE_ID {ULXD4} >'])
+
+        assert probe(conn) is not None
+        assert conn.sent == [b'< GET 1 DEVICE_ID >\r\n< GET DEVICE_ID >\r\n']
+        assert seen == [SHURE_REPLY]
+
+    def test_get_all_is_sent_only_when_neither_query_is_answered(self, monkeypatch):
+        monkeypatch.setattr(discover, '_parse_probe_payload', lambda payload: {'type': 'ulxd'})
+        conn = ScriptedConn([socket.timeout(), SHURE_REPLY.encode()])
+
+        assert probe(conn) is not None
+        assert conn.sent[1:] == [b'< GET 1 ALL >\r\n']
+
+    def test_a_second_reply_is_read_off_before_closing(self, monkeypatch):
+        """Closing on unread data would reset the receiver's connection."""
+        monkeypatch.setattr(discover, '_parse_probe_payload', lambda payload: {'type': 'ulxd'})
+        conn = ScriptedConn([SHURE_REPLY.encode(), b'< REP DEVICE_ID {ULXD4} >'])
+
+        assert probe(conn) is not None
+        assert len(conn.sent) == 1
+        assert conn.replies == []
+
+    def test_a_reset_connection_is_not_a_device(self):
+        conn = ScriptedConn([ConnectionResetError()])
+
+        assert probe(conn) is None
+        assert conn.closed
+
+
+class TestConnectFanOut:
+    """_connect_all against a real listener on loopback."""
+
+    def test_an_unreachable_host_is_left_out(self, monkeypatch):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        # Bound but never listening, so a connect is refused.
+        monkeypatch.setattr(discover, 'PROBE_PORT', listener.getsockname()[1])
+        try:
+            assert discover._connect_all(['127.0.0.1'], 1.0) == []
+        finally:
+            listener.close()
+
+    def test_only_hosts_that_accept_come_back(self, monkeypatch):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(4)
+        monkeypatch.setattr(discover, 'PROBE_PORT', listener.getsockname()[1])
+        try:
+            # 127.0.0.2 is loopback too, but nothing listens there.
+            connected = discover._connect_all(['127.0.0.2', '127.0.0.1'], 1.0)
+            try:
+                assert [ip for ip, _, _ in connected] == ['127.0.0.1']
+                assert connected[0][1].gettimeout() == 1.0
+            finally:
+                for _, sock, _ in connected:
+                    sock.close()
+        finally:
+            listener.close()
+
+    def test_a_failure_partway_closes_every_socket(self, monkeypatch):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(4)
+        monkeypatch.setattr(discover, 'PROBE_PORT', listener.getsockname()[1])
+        opened = []
+
+        class RecordingSocket(socket.socket):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                opened.append(self)
+
+        class FailingSelector(discover.selectors.DefaultSelector):
+            def select(self, timeout=None):
+                raise RuntimeError('select failed')
+
+        monkeypatch.setattr(discover.socket, 'socket', RecordingSocket)
+        monkeypatch.setattr(discover.selectors, 'DefaultSelector', FailingSelector)
+        try:
+            # One loopback host that accepts, one that cannot answer in time.
+            with pytest.raises(RuntimeError):
+                discover._connect_all(['127.0.0.1', '192.0.2.1'], 1.0)
+        finally:
+            listener.close()
+
+        assert len(opened) == 2
+        assert [sock.fileno() for sock in opened] == [-1, -1]
+
+
+class TestSweep:
+    """A whole _probe_network against a receiver faked on loopback."""
+
+    def test_a_receiver_that_answers_is_added(self, monkeypatch):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.bind(('127.0.0.1', 0))
+        listener.listen(1)
+        monkeypatch.setattr(discover, 'PROBE_PORT', listener.getsockname()[1])
+        received = []
+
+        def answer():
+            conn, _ = listener.accept()
+            with conn:
+                received.append(conn.recv(4096))
+                conn.sendall(SHURE_REPLY.encode())
+                conn.recv(4096)
+
+        receiver = threading.Thread(target=answer, daemon=True)
+        receiver.start()
+        added = []
+        monkeypatch.setattr(discover, '_parse_probe_payload', lambda payload: {'type': 'ulxd'})
+        monkeypatch.setattr(discover, 'add_rx_to_dlist', lambda ip, **kwargs: added.append((ip, kwargs)))
+        try:
+            discover._probe_network(ipaddress.IPv4Network('127.0.0.1/32'), 1.0)
+            receiver.join(2.0)
+        finally:
+            listener.close()
+
+        assert received == [b'< GET 1 DEVICE_ID >\r\n< GET DEVICE_ID >\r\n']
+        assert [ip for ip, _ in added] == ['127.0.0.1']
+        assert added[0][1]['rx_type'] == 'ulxd'
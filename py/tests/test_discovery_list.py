@@ -0,0 +1,87 @@
+"""The discovered-receiver list and the ip index kept beside it.
+
+add_rx_to_dlist runs for every multicast packet, so it looks receivers up by
+ip instead of scanning the list and only renumbers slots when a new receiver
+lands. The list still has to come out sorted by ip with slots 1..N, exactly
+as when every add sorted and renumbered it.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discover  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def empty_list(monkeypatch):
+    monkeypatch.setattr(discover, 'discovered', [], raising=False)
+    yield
+
+
+def _layout():
+    return [(entry['slot'], entry['ip']) for entry in discover.discovered]
+
+
+def test_new_receivers_are_kept_in_ip_order():
+    for ip in ['10.0.0.9', '10.0.0.10', '10.0.0.1', '10.0.0.5']:
+        discover.add_rx_to_dlist(ip, 'ulxd')
+
+    assert _layout() == [(1, '10.0.0.1'), (2, '10.0.0.10'), (3, '10.0.0.5'), (4, '10.0.0.9')]
+
+
+def test_an_update_changes_the_entry_not_the_list():
+    discover.add_rx_to_dlist('10.0.0.1', 'ulxd')
+    discover.add_rx_to_dlist('10.0.0.2', 'ulxd')
+    discover.add_rx_to_dlist('10.0.0.1', 'qlxd', channels=2)
+
+    assert _layout() == [(1, '10.0.0.1'), (2, '10.0.0.2')]
+    assert discover.discovered[0]['type'] == 'qlxd'
+    assert discover.discovered[0]['channels'] == 2
+
+
+def test_pruning_closes_the_gap_in_slot_numbers():
+    for ip in ['10.0.0.1', '10.0.0.2', '10.0.0.3']:
+        discover.add_rx_to_dlist(ip, 'ulxd')
+    discover.discovered[1]['timestamp'] = 0
+
+    discover._prune_discovered(60)
+    discover.add_rx_to_dlist('10.0.0.3', 'ulxd')
+
+    assert _layout() == [(1, '10.0.0.1'), (2, '10.0.0.3')]
+
+
+def test_a_list_swapped_in_from_outside_is_reindexed(monkeypatch):
+    discover.add_rx_to_dlist('10.0.0.1', 'ulxd')
+    monkeypatch.setattr(discover, 'discovered', [{'ip': '10.0.0.7', 'channel': 1}])
+
+    discover.add_rx_to_dlist('10.0.0.7', 'ulxd')
+
+    assert _layout() == [(1, '10.0.0.7')]
+
+
+def test_the_web_list_follows_updates_without_sharing_entries():
+    for ip in ['10.0.0.2', '10.0.0.1']:
+        discover.add_rx_to_dlist(ip, 'ulxd')
+    discover.add_rx_to_dlist('10.0.0.2', 'qlxd')
+    discover.add_rx_to_dlist('10.0.0.0', 'axtd')
+
+    listed = discover.time_filterd_discovered_list()
+
+    assert [(entry['slot'], entry['ip'], entry['type']) for entry in listed] == [
+        (1, '10.0.0.0', 'axtd'), (2, '10.0.0.1', 'ulxd'), (3, '10.0.0.2', 'qlxd')]
+    assert all(entry['age'] >= 0 for entry in listed)
+    listed[0]['type'] = 'changed'
+    assert discover.discovered[0]['type'] == 'axtd'
+    assert 'age' not in discover.discovered[0]
+
+
+def test_the_web_list_reads_a_list_swapped_in_from_outside(monkeypatch):
+    discover.add_rx_to_dlist('10.0.0.1', 'ulxd')
+    monkeypatch.setattr(discover, 'discovered', [
+        {'ip': '10.0.0.7', 'channel': 1, 'timestamp': discover.time.time()}])
+
+    assert [entry['ip'] for entry in discover.time_filterd_discovered_list()] == ['10.0.0.7']
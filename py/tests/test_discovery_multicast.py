@@ -0,0 +1,35 @@
+"""Reading a burst of multicast announcements in one wake-up.
+
+After the blocking read returns, whatever else is already queued is read
+without waiting: the drain must stop as soon as the queue is empty, and leave
+the socket's timeout as it found it.
+"""
+
+import os
+import socket
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discover  # noqa: E402
+
+
+def test_reads_what_is_queued_and_does_not_wait_for_more():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(5.0)
+        for index in range(3):
+            sender.sendto(b'packet %d' % index, receiver.getsockname())
+        receiver.recvfrom(4096)
+
+        started = discover.time.monotonic()
+        batch = discover._drain_multicast(receiver)
+
+        assert [data for data, _ in batch] == [b'packet 1', b'packet 2']
+        assert discover.time.monotonic() - started < 1.0
+        assert receiver.gettimeout() == 5.0
+    finally:
+        receiver.close()
+        sender.close()
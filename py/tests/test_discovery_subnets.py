@@ -0,0 +1,67 @@
+"""How configured discovery subnets are normalised.
+
+Common dotted-quad entries skip ipaddress, but the result has to be exactly
+what ipaddress would have produced. Anything unusual -- shorthand addresses,
+leading zeros, netmask prefixes, IPv6 -- must still go through ipaddress so
+it is rejected or warned about the same way as before.
+"""
+
+import ipaddress
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config  # noqa: E402
+
+
+def _reference(candidate):
+    try:
+        if '/' in candidate:
+            network = ipaddress.ip_network(candidate, strict=False)
+        else:
+            network = ipaddress.ip_network(f'{ipaddress.ip_address(candidate)}/32', strict=False)
+    except ValueError:
+        return []
+    if network.version != 4 or network.prefixlen < 16:
+        return []
+    return [str(network)]
+
+
+@pytest.mark.parametrize('candidate', [
+    '192.168.1.0/24',
+    '192.168.1.77/24',
+    '10.0.0.5',
+    '10.20.30.40/16',
+    '172.16.5.9/32',
+    '255.255.255.255/31',
+    '0.0.0.0/16',
+    '10.1',
+    '010.0.0.1',
+    '10.0.0.256',
+    '10.0.0.0/8',
+    '10.0.0.0/33',
+    '10.0.0.0/255.255.255.0',
+    '10.0.0.0/024',
+    '10.0.0.0/',
+    '١٠.0.0.1',
+    'fe80::1',
+    'not-an-address',
+])
+def test_matches_ipaddress(candidate):
+    assert config._normalized_subnet_list([candidate]) == _reference(candidate)
+
+
+def test_duplicates_collapse_after_masking():
+    result = config._normalized_subnet_list(['192.168.1.5/24', '192.168.1.0/24', ' 192.168.1.9/24 '])
+    assert result == ['192.168.1.0/24']
+
+
+def test_a_rejected_subnet_is_warned_about_every_time(caplog):
+    for _ in range(2):
+        with caplog.at_level('WARNING', logger=config.logger.name):
+            caplog.clear()
+            assert config._normalized_subnet_list(['10.0.0.0/8']) == []
+        assert 'too broad' in caplog.text
@@ -0,0 +1,302 @@
+"""Downloading Drive media into the local cache.
+
+A download is one streamed GET written to a temp file beside the destination
+and moved into place, so a failure part-way leaves neither a truncated file at
+the destination nor a temp file behind.
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google_drive  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, chunks, status=200):
+        self.chunks = chunks
+        self.status = status
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise requests.HTTPError(f'{self.status} error')
+
+    def iter_content(self, chunk_size):
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append((url, kwargs))
+        return self.response
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(google_drive.tempfile, 'tempdir', str(tmp_path / 'tmp'))
+    os.makedirs(str(tmp_path / 'tmp'))
+    os.makedirs(str(tmp_path / 'cache'))
+    return tmp_path
+
+
+def _serve(monkeypatch, response):
+    session = FakeSession(response)
+    monkeypatch.setattr(google_drive, '_authorized_session', lambda: session)
+    return session
+
+
+def test_streams_the_file_into_place(temp_dir, monkeypatch):
+    session = _serve(monkeypatch, FakeResponse([b'GIF8', b'9a']))
+    destination = str(temp_dir / 'cache' / 'abc.gif')
+
+    google_drive._download_drive_file('abc/1', destination)
+
+    with open(destination, 'rb') as handle:
+        assert handle.read() == b'GIF89a'
+    url, kwargs = session.requests[0]
+    assert url == google_drive.DRIVE_FILES_URL + 'abc%2F1'
+    assert kwargs['params']['alt'] == 'media'
+    assert kwargs['stream'] is True
+    assert os.listdir(str(temp_dir / 'cache')) == ['abc.gif']
+    assert os.listdir(str(temp_dir / 'tmp')) == []
+
+
+@pytest.mark.parametrize('response', [
+    FakeResponse([], status=404),
+    FakeResponse([b'GIF8', requests.ConnectionError('reset')]),
+])
+def test_a_failed_download_leaves_nothing_behind(temp_dir, monkeypatch, response):
+    _serve(monkeypatch, response)
+    destination = str(temp_dir / 'cache' / 'abc.gif')
+
+    with pytest.raises(google_drive.DriveApiError):
+        google_drive._download_drive_file('abc', destination)
+
+    assert os.listdir(str(temp_dir / 'cache')) == []
+    assert os.listdir(str(temp_dir / 'tmp')) == []
+
+
+def test_the_temp_file_is_written_beside_the_destination(temp_dir, monkeypatch):
+    seen = []
+
+    def chunks():
+        seen.extend(os.listdir(str(temp_dir / 'cache')))
+        yield b'GIF89a'
+
+    response = FakeResponse([])
+    response.iter_content = lambda chunk_size: chunks()
+    _serve(monkeypatch, response)
+
+    google_drive._download_drive_file('abc', str(temp_dir / 'cache' / 'abc.gif'))
+
+    assert len(seen) == 1 and seen[0].startswith('.drive-download-')
+
+
+class TestCacheValidity:
+    def _cached(self, tmp_path, age_hours=0):
+        path = tmp_path / 'abc.gif'
+        path.write_bytes(b'GIF89a')
+        then = google_drive.time.time() - age_hours * 3600
+        os.utime(str(path), (then, then))
+        return str(path)
+
+    def test_a_missing_file_or_a_directory_is_not_a_cache_hit(self, tmp_path):
+        for path in [str(tmp_path / 'missing.gif'), str(tmp_path)]:
+            assert not google_drive._is_cache_valid(
+                path, cached_meta=None, fresh_meta=None, max_age_hours=0)
+
+    def test_an_old_file_is_stale(self, tmp_path):
+        path = self._cached(tmp_path, age_hours=3)
+
+        assert google_drive._is_cache_valid(path, cached_meta=None, fresh_meta=None, max_age_hours=4)
+        assert not google_drive._is_cache_valid(path, cached_meta=None, fresh_meta=None, max_age_hours=2)
+
+    def test_a_changed_remote_file_is_stale(self, tmp_path):
+        path = self._cached(tmp_path)
+
+        assert not google_drive._is_cache_valid(
+            path,
+            cached_meta={'modifiedTime': '2024-01-01T00:00:00Z'},
+            fresh_meta={'modifiedTime': '2024-02-01T00:00:00Z'},
+            max_age_hours=0,
+        )
+
+    def test_an_old_file_drive_confirms_is_current(self, tmp_path):
+        path = self._cached(tmp_path, age_hours=3)
+        revision = {'modifiedTime': '2024-01-01T00:00:00Z'}
+
+        assert google_drive._is_cache_valid(path, cached_meta=revision, fresh_meta=dict(revision), max_age_hours=2)
+        assert not google_drive._is_cache_valid(path, cached_meta={}, fresh_meta=revision, max_age_hours=2)
+
+
+class TestRecheckWindow:
+    """A copy checked against Drive in the last few minutes is served as is."""
+
+    @pytest.fixture
+    def drive(self, tmp_path, monkeypatch):
+        calls = {'metadata': 0, 'download': 0}
+
+        def metadata(file_id):
+            calls['metadata'] += 1
+            return {'id': file_id, 'name': 'loop.gif', 'modifiedTime': '2024-01-01T00:00:00Z'}
+
+        def download(file_id, destination, chunk_size=None):
+            calls['download'] += 1
+            with open(destination, 'wb') as handle:
+                handle.write(b'GIF89a')
+
+        monkeypatch.setattr(google_drive, '_verified_copies', {})
+        monkeypatch.setattr(google_drive, '_cache_directory', lambda: str(tmp_path))
+        monkeypatch.setattr(google_drive, '_cache_max_age_hours', lambda: 168)
+        monkeypatch.setattr(google_drive, 'cache_enabled_by_default', lambda: True)
+        monkeypatch.setattr(google_drive, 'get_file_metadata', metadata)
+        monkeypatch.setattr(google_drive, '_download_drive_file', download)
+        return calls
+
+    def test_a_repeat_request_makes_no_drive_call(self, drive):
+        first = google_drive.ensure_local_copy('abc')
+        second = google_drive.ensure_local_copy('abc')
+
+        assert first == second
+        assert drive == {'metadata': 1, 'download': 1}
+
+    def _expire(self, file_id):
+        _, path = google_drive._verified_copies[file_id]
+        google_drive._verified_copies[file_id] = (google_drive.time.monotonic() - 1, path)
+
+    def test_after_the_window_the_copy_is_checked_again_but_kept(self, drive):
+        path = google_drive.ensure_local_copy('abc')
+        self._expire('abc')
+
+        assert google_drive.ensure_local_copy('abc') == path
+        assert drive == {'metadata': 2, 'download': 1}
+        assert google_drive.ensure_local_copy('abc') == path
+        assert drive == {'metadata': 2, 'download': 1}
+
+    def test_caller_metadata_does_not_renew_the_window(self, drive):
+        path = google_drive.ensure_local_copy('abc')
+        self._expire('abc')
+        stale = {'id': 'abc', 'name': 'loop.gif', 'modifiedTime': '2024-01-01T00:00:00Z'}
+
+        assert google_drive.ensure_local_copy('abc', metadata=stale) == path
+        assert google_drive.ensure_local_copy('abc') == path
+        assert drive == {'metadata': 2, 'download': 1}
+
+    def test_a_copy_kept_on_age_alone_is_not_marked(self, drive, monkeypatch):
+        monkeypatch.setattr(google_drive, 'get_file_metadata', lambda file_id: {'id': file_id, 'name': 'loop.gif'})
+
+        google_drive.ensure_local_copy('abc')
+        google_drive.ensure_local_copy('abc')
+
+        assert google_drive._verified_copies == {}
+
+
+class TestCacheDirectory:
+    """The cache directory is resolved and created once per setting."""
+
+    @pytest.fixture
+    def settings(self, tmp_path, monkeypatch):
+        cache_cfg = {'directory': str(tmp_path / 'one')}
+        monkeypatch.setattr(google_drive, '_cache_settings', lambda: cache_cfg)
+        monkeypatch.setattr(google_drive.config, 'config_path', lambda *_: str(tmp_path))
+        monkeypatch.setattr(google_drive, '_cache_dir_memo', None)
+        return cache_cfg
+
+    def test_repeat_calls_do_not_touch_the_filesystem(self, settings, monkeypatch):
+        first = google_drive._cache_directory()
+        assert os.path.isdir(first)
+
+        def no_makedirs(*args, **kwargs):
+            raise AssertionError('makedirs called for a known directory')
+
+        monkeypatch.setattr(google_drive.os, 'makedirs', no_makedirs)
+        assert google_drive._cache_directory() == first
+
+    def test_a_changed_setting_is_picked_up(self, settings, tmp_path):
+        google_drive._cache_directory()
+        settings['directory'] = str(tmp_path / 'two')
+        assert google_drive._cache_directory() == str(tmp_path / 'two')
+        assert os.path.isdir(tmp_path / 'two')
+
+        settings['directory'] = None
+        assert google_drive._cache_directory() == str(tmp_path / 'drive-cache')
+
+
+class TestManyCopies:
+    """Several files share one metadata batch and download side by side."""
+
+    def test_downloads_overlap_and_missing_files_are_left_out(self, tmp_path, monkeypatch):
+        both_started = threading.Barrier(2, timeout=5)
+        batches = []
+
+        def metadata_many(file_ids):
+            batches.append(list(file_ids))
+            return {
+                file_id: {'id': file_id, 'name': f'{file_id}.gif', 'modifiedTime': '2024-01-01T00:00:00Z'}
+                for file_id in file_ids
+                if file_id != 'gone'
+            }
+
+        def download(file_id, destination, chunk_size=None):
+            # Each download waits for the other to start, which only
+            # happens if they run at the same time.
+            both_started.wait()
+            with open(destination, 'wb') as handle:
+                handle.write(file_id.encode())
+
+        monkeypatch.setattr(google_drive, '_verified_copies', {})
+        monkeypatch.setattr(google_drive, '_cache_directory', lambda: str(tmp_path))
+        monkeypatch.setattr(google_drive, '_cache_max_age_hours', lambda: 168)
+        monkeypatch.setattr(google_drive, 'get_file_metadata_many', metadata_many)
+        monkeypatch.setattr(google_drive, '_download_drive_file', download)
+
+        paths = google_drive.ensure_local_copies(['a', 'b', 'gone', 'a'], use_cache=True)
+
+        assert batches == [['a', 'b', 'gone']]
+        assert sorted(paths) == ['a', 'b']
+        with open(paths['b'], 'rb') as handle:
+            assert handle.read() == b'b'
+
+        assert google_drive.ensure_local_copies(['a', 'b'], use_cache=True) == paths
+        assert len(batches) == 1
+
+    def test_later_calls_reuse_the_download_threads(self, tmp_path, monkeypatch):
+        """The Drive session is cached per thread; fresh threads rebuild it."""
+        threads = []
+
+        def download(file_id, destination, chunk_size=None):
+            threads.append(threading.current_thread())
+            with open(destination, 'wb') as handle:
+                handle.write(file_id.encode())
+
+        monkeypatch.setattr(google_drive, '_download_executor', None)
+        monkeypatch.setattr(google_drive, '_cache_directory', lambda: str(tmp_path))
+        monkeypatch.setattr(google_drive, 'get_file_metadata_many',
+                            lambda file_ids: {file_id: {'id': file_id, 'name': f'{file_id}.jpg'} for file_id in file_ids})
+        monkeypatch.setattr(google_drive, '_download_drive_file', download)
+        try:
+            google_drive.ensure_local_copies(['a'], use_cache=False)
+            google_drive.ensure_local_copies(['b'], use_cache=False)
+        finally:
+            google_drive._get_download_executor().shutdown()
+
+        assert len(threads) == 2
+        assert threads[1] is threads[0]
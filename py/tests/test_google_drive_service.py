@@ -0,0 +1,233 @@
+"""The Drive client for stored credentials is built once per thread.
+
+Building it read the keyring and constructed the whole API surface on every
+call. It is now reused until credentials are stored or cleared -- and only by
+the thread that built it, since the HTTP connection underneath is not
+thread-safe. Metadata for many files goes out in batches of 100 rather than a
+request each. The credentials themselves are read from the keyring once and
+remembered until they are stored again or cleared.
+
+A reused client must not refresh an expired token on its own: the refresh
+would never reach the keyring, and a revoked token would surface as a raw
+RefreshError -- a 500 -- instead of the 401 that sends the UI to re-authorize.
+"""
+
+import json
+import os
+import sys
+import threading
+from unittest import mock
+
+import pytest
+import tornado.web as web
+from google.auth.exceptions import RefreshError
+from tornado.testing import AsyncHTTPTestCase
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import google_drive  # noqa: E402
+import tornado_server  # noqa: E402
+
+
+class StoredCredentials:
+    expired = False
+
+    def __repr__(self):
+        return 'stored-credentials'
+
+
+STORED = StoredCredentials()
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    made = []
+    monkeypatch.setattr(google_drive, '_SERVICE_CACHE', threading.local())
+    monkeypatch.setattr(google_drive, '_get_auth_meta', lambda: google_drive.DriveAuthMeta())
+    monkeypatch.setattr(google_drive, 'load_credentials', lambda: STORED)
+    monkeypatch.setattr(google_drive, 'build',
+                        lambda *args, **kwargs: made.append(kwargs['credentials']) or object())
+    return made
+
+
+def test_stored_credentials_client_is_reused(builds):
+    first = google_drive.build_drive_service()
+
+    assert google_drive.build_drive_service() is first
+    assert builds == [STORED]
+
+
+def test_an_expired_token_is_refreshed_through_load_credentials(builds, monkeypatch):
+    stale = StoredCredentials()
+    monkeypatch.setattr(google_drive, 'load_credentials', lambda: stale)
+    first = google_drive.build_drive_service()
+    stale.expired = True
+    monkeypatch.setattr(google_drive, 'load_credentials', lambda: STORED)
+
+    assert google_drive.build_drive_service() is not first
+    assert builds == [stale, STORED]
+
+
+def test_storing_or_clearing_credentials_rebuilds_it(builds):
+    first = google_drive.build_drive_service()
+    google_drive._forget_services()
+
+    assert google_drive.build_drive_service() is not first
+    assert len(builds) == 2
+
+
+def test_explicit_credentials_are_never_cached(builds):
+    google_drive.build_drive_service('explicit')
+    google_drive.build_drive_service('explicit')
+
+    assert builds == ['explicit', 'explicit']
+
+
+def test_each_thread_builds_its_own(builds):
+    main = google_drive.build_drive_service()
+    other = []
+    worker = threading.Thread(target=lambda: other.append(google_drive.build_drive_service()))
+    worker.start()
+    worker.join()
+
+    assert other[0] is not main
+
+
+class FakeBatch:
+    def __init__(self, callback, sizes):
+        self.callback = callback
+        self.sizes = sizes
+        self.calls = []
+
+    def add(self, request, request_id):
+        self.calls.append(request_id)
+
+    def execute(self):
+        self.sizes.append(len(self.calls))
+        for file_id in self.calls:
+            if file_id.startswith('gone'):
+                self.callback(file_id, None, Exception('404'))
+            else:
+                self.callback(file_id, {'id': file_id}, None)
+
+
+class FakeService:
+    def __init__(self):
+        self.sizes = []
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(callback, self.sizes)
+
+    def files(self):
+        return self
+
+    def get(self, **kwargs):
+        return kwargs
+
+
+def test_metadata_for_many_files_is_batched(monkeypatch):
+    service = FakeService()
+    monkeypatch.setattr(google_drive, 'build_drive_service', lambda: service)
+    ids = [f'file-{index}' for index in range(150)] + ['file-0', 'gone-1', '']
+
+    found = google_drive.get_file_metadata_many(ids)
+
+    assert service.sizes == [100, 51]
+    assert sorted(found) == sorted(f'file-{index}' for index in range(150))
+    assert found['file-7'] == {'id': 'file-7'}
+
+
+class FakeCredentials:
+    expired = False
+    refresh_token = 'refresh'
+    scopes = None
+
+
+@pytest.fixture
+def keyring_reads(monkeypatch):
+    reads = []
+    monkeypatch.setattr(google_drive, '_credentials_memo', None)
+    monkeypatch.setattr(google_drive, '_get_auth_meta', lambda: google_drive.DriveAuthMeta())
+    monkeypatch.setattr(google_drive, '_persist_auth_meta', lambda meta, persist=True: meta)
+    monkeypatch.setattr(google_drive.keyring, 'get_password', lambda *args: reads.append(args) or '{}')
+    monkeypatch.setattr(google_drive.keyring, 'set_password', lambda *args: None)
+    monkeypatch.setattr(google_drive.keyring, 'delete_password', lambda *args: None)
+    monkeypatch.setattr(google_drive, '_serialize_credentials', lambda creds: '{}')
+    monkeypatch.setattr(google_drive, '_deserialize_credentials', lambda payload, scopes: FakeCredentials())
+    return reads
+
+
+def test_stored_credentials_are_read_from_the_keyring_once(keyring_reads):
+    first = google_drive.load_credentials()
+
+    assert google_drive.load_credentials() is first
+    assert len(keyring_reads) == 1
+
+
+def test_storing_replaces_the_remembered_credentials(keyring_reads):
+    google_drive.load_credentials()
+    replacement = FakeCredentials()
+    google_drive.store_credentials(replacement)
+
+    assert google_drive.load_credentials() is replacement
+    assert len(keyring_reads) == 1
+
+
+def test_clearing_forgets_them(keyring_reads):
+    first = google_drive.load_credentials()
+    google_drive.clear_credentials()
+
+    assert google_drive.load_credentials() is not first
+    assert len(keyring_reads) == 2
+
+
+class FakeListing:
+    def __init__(self):
+        self.requests = []
+
+    def files(self):
+        return self
+
+    def list(self, **kwargs):
+        self.requests.append(kwargs)
+        return self
+
+    def execute(self):
+        return {'files': []}
+
+
+@pytest.mark.parametrize('fields, expected', [
+    (None, google_drive.FILE_FIELDS),
+    (google_drive.LIST_FIELDS_MIN, ','.join(google_drive.LIST_FIELDS_MIN)),
+    (['id', 'name'], 'id,name'),
+    ('id,name', 'id,name'),
+])
+def test_listing_fields_accept_a_sequence_or_a_string(monkeypatch, fields, expected):
+    service = FakeListing()
+    monkeypatch.setattr(google_drive, 'build_drive_service', lambda: service)
+
+    google_drive.list_media_files(fields=fields)
+
+    assert service.requests[0]['fields'] == f'files({expected}),nextPageToken'
+
+
+class RevokedListing(FakeListing):
+    def execute(self):
+        raise RefreshError('invalid_grant: Token has been expired or revoked.')
+
+
+class RevokedTokenContract(AsyncHTTPTestCase):
+    def get_app(self):
+        return web.Application([
+            (r'/api/cloud/google-drive/files', tornado_server.GoogleDriveFilesHandler),
+        ])
+
+    def test_a_refresh_failure_in_a_cached_client_asks_for_authorization(self):
+        with mock.patch.object(google_drive, 'build_drive_service', return_value=RevokedListing()), \
+                mock.patch.object(google_drive, 'public_auth_state', return_value={'has_credentials': True}):
+            response = self.fetch('/api/cloud/google-drive/files')
+
+        assert response.code == 401
+        body = json.loads(response.body)
+        assert body['ok'] is False
+        assert body['auth'] == {'has_credentials': True}
@@ -0,0 +1,73 @@
+"""What the JSON formatter writes for each log record.
+
+The formatter runs for every record the application logs, so it avoids
+per-record work where it can -- but the lines it writes must stay exactly as
+they were, since the log viewer and anything reading application.log parse
+them.
+"""
+
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging_utils  # noqa: E402
+
+
+@pytest.mark.parametrize('created', [
+    0.0,
+    1700000000.0,
+    1700000000.5,
+    1700000000.123456,
+    1700000000.9999996,
+    1700000000.0000004,
+    1700000001.0000005,
+    1999999999.999999,
+])
+def test_timestamps_match_datetime(created):
+    expected = datetime.fromtimestamp(created, tz=timezone.utc).isoformat()
+    assert logging_utils._format_timestamp(created) == expected
+
+
+def test_a_record_is_one_json_line():
+    record = logging.LogRecord('micboard.web', logging.WARNING, __file__, 1, 'hello %s', ('there',), None)
+    record.created = 1700000000.25
+
+    line = logging_utils.JsonFormatter().format(record)
+
+    assert json.loads(line) == {
+        'ts': '2023-11-14T22:13:20.250000+00:00',
+        'level': 'WARNING',
+        'logger': 'micboard.web',
+        'source': 'web',
+        'message': 'hello there',
+    }
+
+
+def _record(**extra):
+    record = logging.LogRecord('micboard.web', logging.INFO, __file__, 1, 'hello', (), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_a_plain_record_has_no_context():
+    assert logging_utils._collect_context(_record()) == {}
+    assert logging_utils._collect_context(_record(taskName=None)) == {}
+
+
+def test_an_asyncio_task_name_is_kept():
+    assert logging_utils._collect_context(_record(taskName='Task-1')) == {'taskName': 'Task-1'}
+
+
+def test_extras_and_context_are_collected_in_order():
+    record = _record(context={'slot': 3, 'ip': '10.0.0.5'}, device=('ULXD', 4), gone=None, _private=1)
+
+    context = logging_utils._collect_context(record)
+
+    assert context == {'slot': 3, 'ip': '10.0.0.5', 'device': ['ULXD', 4]}
+    assert list(context) == ['slot', 'ip', 'device']
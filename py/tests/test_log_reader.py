@@ -0,0 +1,179 @@
+"""Paging through application.log for the log viewer.
+
+Cursors are byte offsets, so a page is served by seeking into the file rather
+than reading and splitting all of it. Paging backwards, paging forwards from
+the newest entry seen and filtering must give the same entries, in the same
+order, that walking the file line by line would. A purge empties the log and
+removes its rotated backups.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logging_utils  # noqa: E402
+
+
+def _line(number, level='INFO', logger='micboard.web', **extra):
+    entry = {'ts': '2024-01-01T00:00:00+00:00', 'level': level, 'logger': logger, 'message': f'entry {number}'}
+    entry.update(extra)
+    return json.dumps(entry) + '\n'
+
+
+@pytest.fixture(params=[7, 64 * 1024], ids=['tiny-blocks', 'default-blocks'])
+def logfile(request, tmp_path, monkeypatch):
+    monkeypatch.setattr(logging_utils, '_READ_BLOCK', request.param)
+    path = tmp_path / 'application.log'
+    lines = []
+    for number in range(20):
+        level = 'ERROR' if number % 5 == 0 else 'INFO'
+        lines.append(_line(number, level=level))
+        if number == 10:
+            lines.append('not json\n')
+            lines.append('\n')
+    path.write_text(''.join(lines), encoding='utf-8')
+    return str(path)
+
+
+def _messages(page):
+    return [entry['message'] for entry in page['entries']]
+
+
+def test_pages_backwards_from_the_end(logfile):
+    first = logging_utils.read_log_entries(logfile, limit=8)
+    assert _messages(first) == [f'entry {n}' for n in range(19, 11, -1)]
+    assert first['has_more']
+
+    second = logging_utils.read_log_entries(logfile, limit=8, cursor=first['next_cursor'])
+    assert _messages(second) == [f'entry {n}' for n in range(11, 3, -1)]
+
+    last = logging_utils.read_log_entries(logfile, limit=8, cursor=second['next_cursor'])
+    assert _messages(last) == [f'entry {n}' for n in range(3, -1, -1)]
+    assert not last['has_more']
+
+
+def test_cursors_are_line_offsets_in_file_order(logfile):
+    entries = logging_utils.read_log_entries(logfile, limit=100)['entries']
+    with open(logfile, 'rb') as handle:
+        data = handle.read()
+
+    for entry in entries:
+        offset = entry['index']
+        assert entry['cursor'] == str(offset)
+        assert offset == 0 or data[offset - 1:offset] == b'\n'
+        assert json.loads(data[offset:data.index(b'\n', offset)])['message'] == entry['message']
+    assert [entry['index'] for entry in entries] == sorted((entry['index'] for entry in entries), reverse=True)
+
+
+def test_newer_returns_only_what_follows_the_cursor(logfile):
+    newest = logging_utils.read_log_entries(logfile, limit=100)['entries']
+    seen = newest[5]
+
+    page = logging_utils.read_log_entries(logfile, limit=3, cursor=seen['cursor'], newer=True)
+    assert _messages(page) == ['entry 15', 'entry 16', 'entry 17']
+    assert page['has_more']
+
+    everything = logging_utils.read_log_entries(logfile, limit=100, newer=True)
+    assert _messages(everything) == [f'entry {n}' for n in range(20)]
+
+
+def test_filters_apply_while_paging(logfile):
+    page = logging_utils.read_log_entries(logfile, limit=2, level='error')
+    assert _messages(page) == ['entry 15', 'entry 10']
+
+    rest = logging_utils.read_log_entries(logfile, limit=2, level='error', cursor=page['next_cursor'])
+    assert _messages(rest) == ['entry 5', 'entry 0']
+    assert not rest['has_more']
+
+
+def test_a_half_written_last_line_is_skipped(tmp_path):
+    path = tmp_path / 'application.log'
+    path.write_text(_line(0) + _line(1)[:20], encoding='utf-8')
+
+    assert _messages(logging_utils.read_log_entries(str(path))) == ['entry 0']
+    assert _messages(logging_utils.read_log_entries(str(path), newer=True)) == ['entry 0']
+
+
+def test_a_missing_or_empty_log_has_no_entries(tmp_path):
+    empty = {'entries': [], 'next_cursor': None, 'has_more': False}
+    assert logging_utils.read_log_entries(str(tmp_path / 'missing.log')) == empty
+    (tmp_path / 'empty.log').write_bytes(b'')
+    assert logging_utils.read_log_entries(str(tmp_path / 'empty.log'), newer=True) == empty
+
+
+@pytest.mark.parametrize('level', ['WARNING', 'warning', 'Warning', ' warning ', 'wArNiNg', 'bogus', '', None, 30])
+def test_level_numbers_match_the_normalising_path(level):
+    expected = logging_utils.LEVEL_VALUES.get(logging_utils.normalize_level(level, 'DEBUG'), 10)
+    assert logging_utils.level_to_number(level) == expected
+
+
+def test_every_filter_that_is_set_must_match(tmp_path):
+    path = tmp_path / 'application.log'
+    path.write_text(''.join([
+        _line(0, level='ERROR', logger='micboard.pco'),
+        _line(1, level='ERROR', logger='micboard.web', context={'slot': 'needle'}),
+        _line(2, level='INFO', logger='micboard.web', context={'slot': 'needle'}),
+        _line(3, level='ERROR', logger='micboard.web'),
+    ]), encoding='utf-8')
+
+    page = logging_utils.read_log_entries(str(path), level='ERROR', sources=['WEB'], search='NEEDLE')
+    assert _messages(page) == ['entry 1']
+    assert logging_utils._build_entry_predicate(None, None, None) is None
+
+
+def test_search_looks_at_message_logger_and_context(tmp_path, monkeypatch):
+    path = tmp_path / 'application.log'
+    path.write_text(''.join([
+        _line(0, logger='micboard.web'),
+        _line(1, logger='micboard.discovery', context={'ip': '10.0.0.5'}),
+        _line(2, logger='micboard.web', context={'ip': '10.0.0.5'}),
+    ]), encoding='utf-8')
+    encoded = []
+    real_encode = logging_utils._encode_json
+    monkeypatch.setattr(logging_utils, '_encode_json', lambda value: encoded.append(value) or real_encode(value))
+
+    assert _messages(logging_utils.read_log_entries(str(path), search='ENTRY 1')) == ['entry 1']
+    # Entry 1 matched on its message and entry 0 has no context: only entry
+    # 2's context had to be serialised.
+    assert encoded == [{'ip': '10.0.0.5'}]
+
+    assert _messages(logging_utils.read_log_entries(str(path), search='discovery')) == ['entry 1']
+    assert _messages(logging_utils.read_log_entries(str(path), search='10.0.0.5')) == ['entry 2', 'entry 1']
+
+
+def test_a_line_longer_than_a_block_is_read_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(logging_utils, '_READ_BLOCK', 16)
+    path = tmp_path / 'application.log'
+    path.write_text(_line(0) + _line(1, exc_info='x' * 500) + _line(2), encoding='utf-8')
+
+    entries = logging_utils.read_log_entries(str(path))['entries']
+    assert [entry['message'] for entry in entries] == ['entry 2', 'entry 1', 'entry 0']
+    assert entries[1]['exc_info'] == 'x' * 500
+
+
+def test_purge_empties_the_log_and_removes_every_numbered_backup(tmp_path):
+    path = tmp_path / 'application.log'
+    path.write_text(_line(0), encoding='utf-8')
+    for suffix in ('1', '2', '7', 'bak'):
+        (tmp_path / f'application.log.{suffix}').write_text(_line(1), encoding='utf-8')
+
+    logging_utils.purge_logs(str(path))
+
+    assert sorted(os.listdir(str(tmp_path))) == ['application.log', 'application.log.bak']
+    assert path.read_bytes() == b''
+
+    path.unlink()
+    logging_utils.purge_logs(str(path))
+    assert path.exists()
+
+
+def test_windows_line_endings_and_blank_lines_are_tolerated(tmp_path):
+    path = tmp_path / 'application.log'
+    path.write_bytes((_line(0) + '\r\n' + '   \n' + _line(1)).replace('}\n', '}\r\n').encode('utf-8'))
+
+    assert _messages(logging_utils.read_log_entries(str(path))) == ['entry 1', 'entry 0']
+    assert _messages(logging_utils.read_log_entries(str(path), newer=True)) == ['entry 0', 'entry 1']
@@ -199,9 +199,10 @@ class SlotHandler(web.RequestHandler):
     def post(self):
         data = json.loads(self.request.body)
         self.write('{}')
-        for slot_update in data:
-            config.update_slot(slot_update)
-            logger.debug('Slot update payload: %s', slot_update)
+        with config.config_transaction():
+            for slot_update in data:
+                config.update_slot(slot_update)
+                logger.debug('Slot update payload: %s', slot_update)
 
 
 class SlotDeviceNamesHandler(web.RequestHandler):
@@ -359,15 +360,8 @@ class LogsPurgeHandler(web.RequestHandler):
     def post(self):
         self.set_header('Content-Type', 'application/json')
         self.set_header('Cache-Control', 'no-store, no-cache, must-revalidate, max-age=0')
-        settings = config.get_logging_settings()
-        backups = settings.get('backups', 5)
         try:
-            backups_int = int(backups)
-        except (TypeError, ValueError):
-            backups_int = 5
-
-        try:
-            purge_logs(config.log_file(), backups=backups_int)
+            purge_logs(config.log_file())
         except Exception as exc:
             logger.warning('Failed to purge logs: %s', exc)
             self.set_status(500)